@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The article event stream (/fna/api/articles/stream/) needs it, e.g.
+    gunicorn -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8200 fna.asgi
 """
 
 import os
@@ -86,16 +86,42 @@ WSGI_APPLICATION = 'fna.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('DB_NAME'),        # Your database name
-        'USER': config('DB_USER'),        # Your PostgreSQL username
-        'PASSWORD': config('DB_PASSWORD'),  # Your PostgreSQL password
-        'HOST': 'localhost',             # Or your DB host IP/domain
-        'PORT': '5432',                  # Default PostgreSQL port
+# DB_ENGINE=sqlite runs without Postgres, e.g. `DB_ENGINE=sqlite python manage.py bench_pipeline`.
+# Full-text search, concurrent index builds and live streams need Postgres.
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {'timeout': 30},
+            # A file, so worker threads get their own connections to the test database
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME'),        # Your database name
+            'USER': config('DB_USER'),        # Your PostgreSQL username
+            'PASSWORD': config('DB_PASSWORD'),  # Your PostgreSQL password
+            'HOST': 'localhost',             # Or your DB host IP/domain
+            'PORT': '5432',                  # Default PostgreSQL port
+            # Django passes the pool's check= itself when health checks are on
+            'CONN_HEALTH_CHECKS': True,
+            # Shared, bounded psycopg pool (Django 5.1+). Pipeline worker threads
+            # borrow a connection per article and give it back when done.
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                    'timeout': 30,         # Seconds to wait for a free connection
+                    'max_idle': 300,
+                    'max_lifetime': 3600,
+                },
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -131,6 +157,19 @@ USE_TZ = True
 STATIC_ROOT = '/home/compusky/public_html/fna_static'
 STATIC_URL = 'fna_static/'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Article reads are invalidated through a generation counter kept in the
+# database (webui.cache), so any backend works, including a per-host one.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+}
+READ_CACHE_TIMEOUT = 600
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -145,6 +184,8 @@ OLLAMA_TRANS_MODEL = "qwen3:8b"
 OLLAMA_ANALYZER_MODEL = "qwen3:8b"
 
 GEMINI_API_KEY = config('GEMINI_API_KEY')
+# Optional REST endpoint replacing the Gemini API, e.g. a proxy or the bench_pipeline stand-in
+GEMINI_API_ENDPOINT = config('GEMINI_API_ENDPOINT', default='')
 GEMINI_TRANS_MODEL = "gemini-2.5-flash"
 GEMINI_ANALYZER_MODEL = "gemini-2.5-flash"
 
@@ -154,6 +195,48 @@ GROQ_API_KEY = config('GROQ_API_KEY')
 GROQ_TRANS_MODEL = "llama-3.1-8b-instant"
 GROQ_ANALYZER_MODEL = "llama-3.1-8b-instant"
 
+# Local relevance pre-filter run before translation and analysis.
+# PREFILTER_ACTION: "skip" drops the article, "light" stores it with a translated title only.
+# Either way the URL and the reason are kept in news_skipped, so it is not fetched again.
+PREFILTER_ENABLED = True
+PREFILTER_THRESHOLD = 4
+PREFILTER_ACTION = "skip"
+
+# "compact" uses short instructions and condenses the article to ANALYZER_CONTENT_TOKENS.
+ANALYZER_PROMPT_MODE = "compact"
+ANALYZER_CONTENT_TOKENS = 1500
+# "json" requests structured output and stores it in news_analyses/news_impacts.
+# Its JSON instructions replace the full/compact ones, while
+# ANALYZER_PROMPT_MODE = "compact" still condenses the article content.
+ANALYZER_OUTPUT = "json"
+
+# Article bodies older than this are moved to compressed cold storage by
+# the archive_content command.
+ARCHIVE_CONTENT_AFTER_DAYS = 30
+
+# Work queue used by `crawler --mode enqueue` and `crawler --mode work`.
+# A job whose worker stops renewing its lease is retried, up to CRAWL_MAX_ATTEMPTS times.
+CRAWL_LEASE_SECONDS = 900
+CRAWL_MAX_ATTEMPTS = 3
+CRAWL_POLL_SECONDS = 10
+# Done and failed jobs are deleted this many days after they finished.
+CRAWL_JOB_RETENTION_DAYS = 7
+
+# Freshness scheduling: newest articles are processed first. CRAWL_SOURCE_WEIGHTS
+# gives a source a head start in minutes, e.g. {"yahoo": 30}. Articles older than
+# CRAWL_DEADLINE_MINUTES get CRAWL_STALE_ACTION: "process" analyzes them anyway,
+# "light" stores a translated title only, "drop" skips them. Keep "process" when
+# the first crawl of a source should analyze its whole feed.
+CRAWL_SOURCE_WEIGHTS = {}
+CRAWL_DEADLINE_MINUTES = 180
+CRAWL_STALE_ACTION = "process"
+
+# Crawler stage timings, LLM token counts and error rates in the Prometheus
+# text format, served at /fna/api/metrics/. `crawler --metrics` turns them on for one run.
+# Every crawler process writes its own <host>-<pid>.prom file into METRICS_DIR.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_DIR = BASE_DIR / 'crawler_metrics'
+
 
 LOGGING = {
     'version': 1,
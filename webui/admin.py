@@ -1,15 +1,90 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 from unfold.admin import ModelAdmin
+from .archive import archive_articles, is_archived, restore_content, search_archived
+from .cache import bump_generation, cached_read
+from .filters import CachedAllValuesFieldListFilter
 from .models import NewsArticles
+from .paginator import EstimatedCountPaginator
+from .search import is_available, search_articles
+
+class RankedChangeListMixin:
+    """
+    Keeps the ranked order set by get_search_results. The stock changelist
+    puts ModelAdmin.ordering in front of the queryset's own ordering.
+    """
+    def get_ordering(self, request, queryset):
+        if ORDER_VAR not in self.params and queryset.query.order_by[:1] == ('-search_rank',):
+            return list(queryset.query.order_by)
+        return super().get_ordering(request, queryset)
+
 
 # Register your models here.
 #@admin.site.register(NewsArticles)
 @admin.register(NewsArticles)
 class NewsArticlesAdmin(ModelAdmin):
     list_display = ['id', 'source_name', 'cn_title', 'publish_date', 'author', 'created_at']
-    list_filter = ['source_name', 'publish_date', 'author']
+    list_filter = [('source_name', CachedAllValuesFieldListFilter), 'publish_date',
+                   ('author', CachedAllValuesFieldListFilter)]
+    # Large text columns the changelist never shows
+    list_deferred = ['title', 'original_content', 'translated_content', 'result']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Only used as a fallback, on Postgres the search goes through search_vector
     search_fields = ['cn_title', 'original_content', 'translated_content', 'result']
     ordering = ['-id', 'source_name', 'cn_title', 'publish_date', 'author']
     fields = ['publish_date', 'cn_title', 'translated_content', 'result', 'author', 'source_name',
               'title', 'original_content', 'source_url', 'crawl_date', 'created_at', 'translator', 'analyzer',]
     conditional_fields = {}
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == f'{self.opts.app_label}_{self.opts.model_name}_changelist':
+            qs = qs.defer(*self.list_deferred)
+        return qs
+
+    def get_changelist(self, request, **kwargs):
+        return type('RankedChangeList', (RankedChangeListMixin, super().get_changelist(request, **kwargs)), {})
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        if not is_available():
+            results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+            # The column lookups cannot see archived bodies
+            return results | queryset.filter(id__in=search_archived(search_term)), may_have_duplicates
+        queryset = search_articles(queryset, search_term)
+        # Best matches first, unless a column is sorted. search_rank only
+        # exists from here on, so it cannot be part of get_ordering().
+        if ORDER_VAR not in request.GET and 'search_rank' in queryset.query.annotations:
+            queryset = queryset.order_by('-search_rank', '-id')
+        return queryset, False
+
+    def get_object(self, request, object_id, from_field=None):
+        if from_field is not None:
+            return super().get_object(request, object_id, from_field)
+
+        def load():
+            obj = super(NewsArticlesAdmin, self).get_object(request, object_id)
+            # Archived bodies are loaded lazily, only when the detail view opens
+            return restore_content(obj) if obj is not None else None
+
+        return cached_read("object", object_id, load, request=request)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page, request=request)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and is_archived(obj):
+            archive_articles([obj])
+        bump_generation(request)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_generation(request)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_generation(request)
@@ -0,0 +1,180 @@
+import re
+import json
+import logging
+from django.db import transaction
+from webui.models import NewsAnalysis, NewsImpact
+
+logger = logging.getLogger(__name__)
+
+# Sector keys and the headings used in the rendered text.
+SECTORS = {
+    "tech": "科技股",
+    "finance": "金融股",
+    "energy": "能源股",
+    "travel": "出行旅游股",
+    "healthcare": "医疗健康股",
+}
+
+IMPACTS = {"positive": "正面", "negative": "负面", "neutral": "中性"}
+
+IMPACT_ALIASES = {
+    "positive": "positive", "正面": "positive", "利好": "positive", "积极": "positive",
+    "negative": "negative", "负面": "negative", "利空": "negative", "消极": "negative",
+    "neutral": "neutral", "中性": "neutral", "中立": "neutral", "": "neutral",
+}
+
+THINK_PATTERN = re.compile(r"<think>.*?</think>", flags=re.DOTALL)
+
+
+def normalize_impact(value: str) -> str:
+    value = (value or "").strip().lower()
+    if value in IMPACT_ALIASES:
+        return IMPACT_ALIASES[value]
+    raise ValueError(f"Invalid impact: {value}")
+
+
+def guess_impact(text: str) -> str:
+    """Sentiment of free text impact analysis, used for backfilled rows."""
+    positive = len(re.findall(r"正面|利好|积极|上涨|受益", text))
+    negative = len(re.findall(r"负面|利空|消极|下跌|承压|风险", text))
+    if positive > negative:
+        return "positive"
+    if negative > positive:
+        return "negative"
+    return "neutral"
+
+
+def _item(data: dict, where: str) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError(f"{where} must be an object")
+    return {
+        "impact": normalize_impact(str(data.get("impact", ""))),
+        "reason": str(data.get("reason", "")).strip(),
+        "advice": str(data.get("advice", "")).strip(),
+    }
+
+
+def parse_analysis(text: str) -> dict:
+    """
+    Parses and validates the JSON analysis returned by an analyzer.
+    Raises ValueError when it does not match the expected structure.
+    """
+    text = THINK_PATTERN.sub("", text or "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("No JSON object in analysis")
+    try:
+        raw = json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in analysis: {e}")
+    summary = str(raw.get("summary", "")).strip()
+    if not summary:
+        raise ValueError("Missing summary")
+    companies_raw = raw.get("companies") or []
+    if not isinstance(companies_raw, list):
+        raise ValueError("companies must be a list")
+    companies = []
+    for company in companies_raw:
+        name = str(company.get("name", "")).strip() if isinstance(company, dict) else ""
+        if name:
+            companies.append({"name": name[:100], **_item(company, f"company {name}")})
+    sectors_raw = raw.get("sectors") or {}
+    if not isinstance(sectors_raw, dict):
+        raise ValueError("sectors must be an object")
+    sectors = {}
+    for key in SECTORS:
+        if key not in sectors_raw:
+            raise ValueError(f"Missing sector: {key}")
+        sectors[key] = _item(sectors_raw[key], f"sector {key}")
+    return {
+        "summary": summary,
+        "companies": companies,
+        "sectors": sectors,
+        "risk": str(raw.get("risk", "")).strip(),
+        "related": "",
+    }
+
+
+def render_analysis(data: dict) -> str:
+    """
+    Renders a structured analysis in the markdown format stored in
+    NewsArticles.result.
+    """
+    lines = ["**新闻摘要：**", data["summary"], "", "**相关股票影响与建议：**"]
+    if data["companies"]:
+        for company in data["companies"]:
+            lines += [
+                f"* **{company['name']}：**",
+                f"    * **影响：** [{IMPACTS[company['impact']]}] {company['reason']}",
+                f"    * **建议：** {company['advice']}",
+            ]
+    elif data.get("related"):
+        # Legacy analyses only have a free text block for the related stocks
+        lines += [data["related"]]
+    else:
+        lines += ["* **影响：** 无直接相关公司", "* **建议：** 无"]
+    lines += ["", "**行业股票影响与建议：**"]
+    for key, label in SECTORS.items():
+        sector = data["sectors"][key]
+        lines += [
+            f"* **{label}影响与建议：**",
+            f"    * **影响：** [{IMPACTS[sector['impact']]}] {sector['reason']}",
+            f"    * **建议：** {sector['advice']}",
+        ]
+    lines += ["", "**风险提示：**", data["risk"]]
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def _section(text: str, heading: str) -> str:
+    m = re.search(r"\*\*" + re.escape(heading) + r"[：:]?\*\*(.*?)(?=\n\s*\*\*[^*\n]+[：:]\*\*\s*\n|\Z)", text, flags=re.DOTALL)
+    return m.group(1).strip() if m else ""
+
+
+def _impact_advice(block: str) -> dict:
+    impact = re.search(r"\*\*影响[：:]\*\*\s*(.*)", block)
+    advice = re.search(r"\*\*建议[：:]\*\*\s*(.*)", block)
+    reason = impact.group(1).strip() if impact else ""
+    return {
+        "impact": guess_impact(reason),
+        "reason": reason,
+        "advice": advice.group(1).strip() if advice else "",
+    }
+
+
+def parse_markdown(text: str) -> dict:
+    """
+    Best-effort parse of a legacy markdown analysis into the structured form,
+    used to backfill rows stored before structured output. The legacy
+    related stocks block names no company, so it is kept as free text in
+    "related" instead of becoming a company impact.
+    """
+    data = {
+        "summary": _section(text, "新闻摘要") or text.strip()[:500],
+        "companies": [],
+        "sectors": {},
+        "risk": _section(text, "风险提示"),
+        "related": _section(text, "相关股票影响与建议"),
+    }
+    for key, label in SECTORS.items():
+        m = re.search(r"\*\*" + re.escape(label) + r"影响与建议[：:]\*\*(.*?)(?=\n\s*\*\s*\*\*[^*\n]+影响与建议|\n\s*\*\*风险提示|\Z)",
+                      text, flags=re.DOTALL)
+        data["sectors"][key] = _impact_advice(m.group(1)) if m else {"impact": "neutral", "reason": "", "advice": ""}
+    return data
+
+
+def save_analysis(article, data: dict) -> NewsAnalysis:
+    with transaction.atomic():
+        analysis = NewsAnalysis.objects.create(article=article, summary=data["summary"], risk=data["risk"],
+                                               related=data.get("related", ""))
+        impacts = [
+            NewsImpact(analysis=analysis, scope=NewsImpact.COMPANY, name=c["name"],
+                       impact=c["impact"], reason=c["reason"], advice=c["advice"])
+            for c in data["companies"]
+        ]
+        impacts += [
+            NewsImpact(analysis=analysis, scope=NewsImpact.SECTOR, name=key,
+                       impact=s["impact"], reason=s["reason"], advice=s["advice"])
+            for key, s in data["sectors"].items()
+        ]
+        NewsImpact.objects.bulk_create(impacts)
+    return analysis
@@ -3,19 +3,112 @@ import requests
 from abc import ABC, abstractmethod
 import logging
 from django.conf import settings
-import google.generativeai as genai
-from groq import Groq
-from webui.agent.utils import gemini_gen, groq_gen
+from webui.agent import metrics
+from webui.agent.utils import configure_gemini, gemini_gen, groq_gen, load_provider, UnknownProvider, condense, estimate_tokens
 
 
 logger = logging.getLogger(__name__)
 
+FULL_INSTRUCTIONS = """
+请你作为一名资深的财经新闻分析师，仔细阅读以下新闻文章，然后完成以下任务：
+1.  **新闻摘要：** 总结新闻文章的**核心内容**，生成一个简洁的摘要。
+2.  **相关股票影响与建议：** 分析该文章可能对新闻中直接提及或高度相关的**特定公司股票**产生的影响（正面、负面或中性），并说明理由。基于此影响，给出对这些股票的概括性操作建议（例如：关注、谨慎买入、观望、注意风险、短期波动等），并简要解释。
+3.  **行业股票影响与建议：**
+    * **科技股影响与建议：** 分析该文章对整个科技（包括AI、半导体等）行业股票的可能影响及操作建议。
+    * **金融股影响与建议：** 分析该文章对银行、保险、券商等金融行业股票的可能影响及操作建议。
+    * **能源股影响与建议：** 分析该文章对石油、天然气、可再生能源等能源行业股票的可能影响及操作建议。
+    * **出行旅游股影响与建议：** 分析该文章对航空公司、酒店、OTA平台等出行旅游行业股票的可能影响及操作建议。
+    * **医疗健康股影响与建议：** 分析该文章对制药、生物科技、医疗设备、医疗服务等医疗健康行业股票的可能影响及操作建议。
+
+请严格按照以下格式输出你的分析和建议：
+
+**新闻摘要：**
+[新闻摘要内容]
+
+**相关股票影响与建议：**
+* **影响：** [影响分析]
+* **建议：** [操作建议]
+
+**行业股票影响与建议：**
+* **科技股影响与建议：**
+    * **影响：** [影响分析]
+    * **建议：** [操作建议]
+* **金融股影响与建议：**
+    * **影响：** [影响分析]
+    * **建议：** [操作建议]
+* **能源股影响与建议：**
+    * **影响：** [影响分析]
+    * **建议：** [操作建议]
+* **出行旅游股影响与建议：**
+    * **影响：** [影响分析]
+    * **建议：** [操作建议]
+* **医疗健康股影响与建议：**
+    * **影响：** [影响分析]
+    * **建议：** [操作建议]
+
+**风险提示：**
+[风险提示内容]
+""".strip()
+
+COMPACT_INSTRUCTIONS = """
+你是资深财经新闻分析师。阅读新闻后，用简体中文严格按以下格式输出，每项一两句：
+
+**新闻摘要：**
+[核心内容]
+
+**相关股票影响与建议：**
+* **影响：** [对提及公司股票的影响（正面/负面/中性）及理由]
+* **建议：** [关注/谨慎买入/观望/注意风险等]
+
+**行业股票影响与建议：**
+* **科技股影响与建议：**
+    * **影响：** [影响]
+    * **建议：** [建议]
+* **金融股影响与建议：**
+    * **影响：** [影响]
+    * **建议：** [建议]
+* **能源股影响与建议：**
+    * **影响：** [影响]
+    * **建议：** [建议]
+* **出行旅游股影响与建议：**
+    * **影响：** [影响]
+    * **建议：** [建议]
+* **医疗健康股影响与建议：**
+    * **影响：** [影响]
+    * **建议：** [建议]
+
+**风险提示：**
+[风险提示]
+""".strip()
+
+STRUCTURED_INSTRUCTIONS = """
+你是资深财经新闻分析师。阅读新闻后，只输出一个JSON对象，不要输出其他内容。文本字段使用简体中文，每项一两句。
+impact 只能是 "positive"、"negative" 或 "neutral"。格式：
+{
+  "summary": "新闻核心内容摘要",
+  "companies": [{"name": "新闻中直接提及或高度相关的公司", "impact": "positive", "reason": "影响理由", "advice": "操作建议"}],
+  "sectors": {
+    "tech": {"impact": "neutral", "reason": "对科技（AI、半导体等）股的影响", "advice": "操作建议"},
+    "finance": {"impact": "neutral", "reason": "对银行、保险、券商股的影响", "advice": "操作建议"},
+    "energy": {"impact": "neutral", "reason": "对石油、天然气、可再生能源股的影响", "advice": "操作建议"},
+    "travel": {"impact": "neutral", "reason": "对航空、酒店、OTA等出行旅游股的影响", "advice": "操作建议"},
+    "healthcare": {"impact": "neutral", "reason": "对制药、生物科技、医疗设备及服务股的影响", "advice": "操作建议"}
+  },
+  "risk": "风险提示"
+}
+""".strip()
+
+
 class Analyzer(ABC):
     """
     Base class for all AI models, defining a consistent interface for news analysis.
     """
     def __init__(self):
         self.headers = {"Content-Type": "application/json"}
+        self.prompt_mode = getattr(settings, "ANALYZER_PROMPT_MODE", "full")
+        self.content_tokens = getattr(settings, "ANALYZER_CONTENT_TOKENS", 1500)
+        # "json" asks the provider for structured output, see webui.agent.analysis
+        self.structured = getattr(settings, "ANALYZER_OUTPUT", "text") == "json"
 
     @abstractmethod
     def analyze_news_impact(self, news_title: str, news_content: str) -> str: # Return type changed to str
@@ -32,72 +125,63 @@ class Analyzer(ABC):
         """
         pass
 
-    def generate_prompt(self, news_title: str, news_content: str) -> str:
+    def get_instructions(self) -> str:
         """
-        Generates the detailed prompt for the Ollama model with the revised format.
+        Returns the fixed instruction block. It never depends on the article,
+        so providers can cache it as a prompt prefix. Structured output has
+        a single instruction block; the prompt mode then only decides how
+        much of the article is sent.
         """
-        prompt = f"""
-        请你作为一名资深的财经新闻分析师，仔细阅读以下新闻文章，然后完成以下任务：
-        1.  **新闻摘要：** 总结新闻文章的**核心内容**，生成一个简洁的摘要。
-        2.  **相关股票影响与建议：** 分析该文章可能对新闻中直接提及或高度相关的**特定公司股票**产生的影响（正面、负面或中性），并说明理由。基于此影响，给出对这些股票的概括性操作建议（例如：关注、谨慎买入、观望、注意风险、短期波动等），并简要解释。
-        3.  **行业股票影响与建议：**
-            * **科技股影响与建议：** 分析该文章对整个科技（包括AI、半导体等）行业股票的可能影响及操作建议。
-            * **金融股影响与建议：** 分析该文章对银行、保险、券商等金融行业股票的可能影响及操作建议。
-            * **能源股影响与建议：** 分析该文章对石油、天然气、可再生能源等能源行业股票的可能影响及操作建议。
-            * **出行旅游股影响与建议：** 分析该文章对航空公司、酒店、OTA平台等出行旅游行业股票的可能影响及操作建议。
-            * **医疗健康股影响与建议：** 分析该文章对制药、生物科技、医疗设备、医疗服务等医疗健康行业股票的可能影响及操作建议。
-
-        请严格按照以下格式输出你的分析和建议：
-
-        **新闻摘要：**
-        [新闻摘要内容]
-
-        **相关股票影响与建议：**
-        * **影响：** [影响分析]
-        * **建议：** [操作建议]
-
-        **行业股票影响与建议：**
-        * **科技股影响与建议：**
-            * **影响：** [影响分析]
-            * **建议：** [操作建议]
-        * **金融股影响与建议：**
-            * **影响：** [影响分析]
-            * **建议：** [操作建议]
-        * **能源股影响与建议：**
-            * **影响：** [影响分析]
-            * **建议：** [操作建议]
-        * **出行旅游股影响与建议：**
-            * **影响：** [影响分析]
-            * **建议：** [操作建议]
-        * **医疗健康股影响与建议：**
-            * **影响：** [影响分析]
-            * **建议：** [操作建议]
-
-        **风险提示：**
-        [风险提示内容]
-
-        新闻文章标题：{news_title}
-        新闻文章内容：{news_content}
+        if self.structured:
+            return STRUCTURED_INSTRUCTIONS
+        if self.prompt_mode == "compact":
+            return COMPACT_INSTRUCTIONS
+        return FULL_INSTRUCTIONS
+
+    def get_article(self, news_title: str, news_content: str) -> str:
         """
-        return prompt.strip()
+        Returns the article part of the prompt. In compact mode the content is
+        condensed to its most informative sentences within the token budget.
+        """
+        content = news_content
+        if self.prompt_mode == "compact":
+            content = condense(news_content, self.content_tokens, news_title)
+        before = estimate_tokens(FULL_INSTRUCTIONS) + estimate_tokens(news_title) + estimate_tokens(news_content)
+        after = estimate_tokens(self.get_instructions()) + estimate_tokens(news_title) + estimate_tokens(content)
+        logger.info(f"Analyzer prompt tokens ({self.prompt_mode}): {before} -> {after}")
+        return f"新闻文章标题：{news_title}\n新闻文章内容：{content}"
+
+    def generate_prompt(self, news_title: str, news_content: str) -> str:
+        """
+        Generates the full single-message prompt, instructions first.
+        """
+        return f"{self.get_instructions()}\n\n{self.get_article(news_title, news_content)}"
     
 
 class GeminiAnalyzer(Analyzer):
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_TRANS_MODEL)
+        import google.generativeai as genai
+        super().__init__()
+        configure_gemini(genai)
+        # Fixed instructions go in the system instruction so Gemini can cache them
+        generation_config = {"response_mime_type": "application/json"} if self.structured else None
+        self.model = genai.GenerativeModel(settings.GEMINI_TRANS_MODEL, system_instruction=self.get_instructions(),
+                                           generation_config=generation_config)
     
     def analyze_news_impact(self, news_title: str, news_content: str) -> str:
-        return gemini_gen(self.model, self.generate_prompt(news_title, news_content))
+        return gemini_gen(self.model, self.get_article(news_title, news_content))
         
 
 class GroqAnalyzer(Analyzer):
     def __init__(self):
+        from groq import Groq
+        super().__init__()
         self.client = Groq(api_key=settings.GROQ_API_KEY)
         self.model = settings.GROQ_TRANS_MODEL
     
     def analyze_news_impact(self, news_title: str, news_content: str) -> str:
-        return groq_gen(self.client, self.model, self.generate_prompt(news_title, news_content))
+        return groq_gen(self.client, self.model, self.get_article(news_title, news_content),
+                        system=self.get_instructions(), json_mode=self.structured)
     
     
 class OllamaAnalyzer(Analyzer):
@@ -114,11 +198,14 @@ class OllamaAnalyzer(Analyzer):
         """
         Analyzes news impact using the Ollama model, returning the full text response.
         """
-        prompt = self.generate_prompt(news_title, news_content)
+        # A constant system prompt keeps the prefix identical between calls,
+        # so Ollama can reuse its KV cache for it
         data = {
             "model": self.model_name,
-            "prompt": prompt,
+            "system": self.get_instructions(),
+            "prompt": self.get_article(news_title, news_content),
             "stream": False,
+            **({"format": "json"} if self.structured else {}),
             "options": {
                 "temperature": 0.3, # Adjust for less randomness, more factual
                 "top_k": 40,
@@ -126,22 +213,33 @@ class OllamaAnalyzer(Analyzer):
             }
         }
 
+        call = metrics.llm_call("ollama")
         try:
             response = requests.post(self.api_base_url, headers=self.headers, json=data, timeout=180)
             response.raise_for_status()
             result = response.json()
             full_response_text = result.get('response', '').strip()
+            call.usage(prompt=result.get('prompt_eval_count'), completion=result.get('eval_count'))
+            call.done(data["system"] + data["prompt"], full_response_text)
             return full_response_text # Directly return the full text response
         except Exception as e:
+            call.failed()
             logger.error(f"An unexpected error occurred during news analysis: {e}")
             return ""
         
 
+# Provider SDKs are imported in each constructor, so only the configured
+# analyzer pays for its imports.
+ANALYZERS = {
+    "ollama": "webui.agent.analyzer.OllamaAnalyzer",
+    "gemini": "webui.agent.analyzer.GeminiAnalyzer",
+    "groq": "webui.agent.analyzer.GroqAnalyzer",
+}
+
+
 def get_analyzer(analyzer_name: str):
-    if analyzer_name == "ollama":
-        return OllamaAnalyzer()
-    if analyzer_name == "gemini":
-        return GeminiAnalyzer()
-    if analyzer_name == "groq":
-        return GroqAnalyzer()
-    raise Exception(f"Unsupported analyzer: {analyzer_name}")
\ No newline at end of file
+    try:
+        analyzer_class = load_provider(ANALYZERS, analyzer_name, "ANALYZER_REGISTRY")
+    except UnknownProvider:
+        raise Exception(f"Unsupported analyzer: {analyzer_name}")
+    return analyzer_class()
@@ -0,0 +1,369 @@
+import re
+import json
+import time
+import random
+import logging
+import threading
+from pathlib import Path
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from django.conf import settings
+from webui.agent import metrics
+from webui.agent.analysis import SECTORS, render_analysis
+from webui.agent.rss_scraper import YahooFinanceScraper
+from webui.agent.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Offline stand-ins for everything the pipeline talks to, used by the
+# bench_pipeline command: an RSS feed and article pages in the Yahoo Finance
+# markup, and Groq, Gemini and Ollama compatible endpoints with configurable
+# latency, streaming chunk sizes and injected errors.
+
+COMPANIES = [
+    ("Apple", "AAPL"), ("Microsoft", "MSFT"), ("Nvidia", "NVDA"), ("Amazon", "AMZN"), ("Tesla", "TSLA"),
+    ("JPMorgan", "JPM"), ("Goldman Sachs", "GS"), ("Exxon", "XOM"), ("Chevron", "CVX"), ("Delta", "DAL"),
+    ("Marriott", "MAR"), ("Pfizer", "PFE"), ("Eli Lilly", "LLY"), ("Walmart", "WMT"), ("Boeing", "BA"),
+]
+SENTENCES = [
+    "{company} ({ticker}) shares rose {pct}% after quarterly revenue of ${rev} billion beat analyst forecasts.",
+    "The company raised its full-year guidance and announced a ${buyback} billion buyback.",
+    "Analysts at {bank} kept an overweight rating and lifted the price target to ${target}.",
+    "Investors are weighing the outlook for interest rate cuts after the latest CPI report showed inflation at {cpi}%.",
+    "Treasury yields climbed to {yield_}% as traders priced fewer cuts from the Federal Reserve this year.",
+    "Oil prices slipped {pct}% as OPEC signaled higher output, weighing on energy stocks.",
+    "The S&P 500 gained {idx}% while the Nasdaq added {pct}% in afternoon trading.",
+    "Management said demand for its semiconductor products remained strong across data center customers.",
+    "The acquisition, valued at ${rev} billion, is expected to close in the second half pending regulatory approval.",
+    "Airlines reported record bookings, and the company expects travel demand to stay firm through the summer.",
+    "The FDA approval opens a market analysts estimate at ${rev} billion by the end of the decade.",
+    "Tariffs on imported components could cut gross margin by {pct} percentage points, the CFO warned.",
+    "Layoffs of about {jobs} employees are part of a restructuring aimed at lifting profit next quarter.",
+    "Bank stocks outperformed as net interest income rose {pct}% year over year.",
+    "The dividend was raised to ${div} per share, the {nth} consecutive annual increase.",
+    "Short sellers have increased positions, and options activity suggests volatility ahead of earnings.",
+    "Consumer spending held up in the jobs report, easing fears of a sharp slowdown in GDP growth.",
+    "The stock trades at {pe} times forward earnings, above its five-year average.",
+]
+BANKS = ["Morgan Stanley", "Goldman Sachs", "Bank of America", "Citigroup", "Wells Fargo"]
+CN_WORDS = ["美联储", "降息", "通胀", "股市", "科技股", "银行", "能源", "原油", "关税", "投资者", "财报",
+            "营收", "利润", "芯片", "航空", "医疗", "美元", "国债", "收益率", "市场", "上涨", "下跌",
+            "预期", "经济", "增长", "风险", "公司", "股价", "分析师", "季度"]
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><article>
+<h1 class="cover-title">{title}</h1>
+<div class="byline-attr-author">{author}</div>
+<time class="byline-attr-meta-time" datetime="{published}">{published}</time>
+<div class="body">
+{paragraphs}
+</div>
+</article></body></html>
+"""
+
+
+def yahoo_link_name(link: str) -> str:
+    return urlsplit(link).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+class Fixtures:
+    """
+    An RSS feed and the article pages it links to. Links are stored with a
+    {base} placeholder that is replaced by the fake server's address.
+    """
+    def __init__(self, feed: str, pages: dict):
+        self.feed = feed
+        self.pages = pages
+
+    @classmethod
+    def generate(cls, count: int, seed: int = 0):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        items = []
+        pages = {}
+        for i in range(count):
+            company, ticker = rng.choice(COMPANIES)
+            values = {
+                "company": company, "ticker": ticker, "bank": rng.choice(BANKS),
+                "pct": round(rng.uniform(0.5, 9.5), 1), "rev": round(rng.uniform(1, 120), 1),
+                "buyback": rng.randint(1, 50), "target": rng.randint(50, 900), "cpi": round(rng.uniform(2, 5), 1),
+                "yield_": round(rng.uniform(3.5, 5.2), 2), "idx": round(rng.uniform(0.1, 2.5), 1),
+                "jobs": rng.randint(200, 12000), "div": round(rng.uniform(0.1, 3), 2),
+                "nth": rng.randint(2, 40), "pe": rng.randint(8, 60),
+            }
+            sentences = [SENTENCES[0]] + rng.sample(SENTENCES[1:], 10)
+            paragraphs = [s.format(**values) + f" ({i}-{j})" for j, s in enumerate(sentences)]
+            title = f"{company} stock moves {values['pct']}% on earnings, story {i}"
+            published = now - timedelta(minutes=5 * i)
+            name = f"{company.lower().replace(' ', '-')}-story-{i}.html"
+            pages[name] = PAGE.format(
+                title=title, author=f"Reporter {i % 7}", published=published.isoformat(),
+                paragraphs="\n".join(f"<p>{p}</p>" for p in paragraphs),
+            )
+            items.append(f"<item><title>{title}</title><link>{{base}}/news/{name}</link>"
+                         f"<pubDate>{format_datetime(published)}</pubDate></item>")
+        feed = ('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel><title>Bench</title>\n'
+                + "\n".join(items) + "\n</channel></rss>\n")
+        return cls(feed, pages)
+
+    @classmethod
+    def load(cls, directory):
+        """Reads feed.xml and articles/*.html, as written by save() or recorded from the live site."""
+        directory = Path(directory)
+        feed = (directory / "feed.xml").read_text(encoding="utf-8")
+        feed = re.sub(r"<link>\s*([^<]+?)\s*</link>",
+                      lambda m: f"<link>{{base}}/news/{yahoo_link_name(m.group(1))}</link>"
+                      if m.group(1).startswith("http") else m.group(0), feed)
+        pages = {p.name: p.read_text(encoding="utf-8") for p in (directory / "articles").glob("*.html")}
+        return cls(feed, pages)
+
+    def save(self, directory):
+        directory = Path(directory)
+        (directory / "articles").mkdir(parents=True, exist_ok=True)
+        (directory / "feed.xml").write_text(self.feed, encoding="utf-8")
+        for name, html in self.pages.items():
+            (directory / "articles" / name).write_text(html, encoding="utf-8")
+
+
+def record_fixtures(directory, limit: int = 50):
+    """Records the live Yahoo feed and the rendered pages it links to."""
+    import requests
+    scraper = YahooFinanceScraper()
+    directory = Path(directory)
+    (directory / "articles").mkdir(parents=True, exist_ok=True)
+    (directory / "feed.xml").write_bytes(requests.get(scraper.feed_url, timeout=30).content)
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            page = browser.new_page()
+            for item in scraper.list_feed_items()[:limit]:
+                page.goto(item["link"], timeout=30000, wait_until="domcontentloaded")
+                (directory / "articles" / yahoo_link_name(item["link"])).write_text(page.content(), encoding="utf-8")
+                logger.info(f"Recorded {item['link']}")
+        finally:
+            browser.close()
+
+
+class FakeConfig:
+    def __init__(self, ttft_ms: int = 300, chunk_ms: int = 20, chunk_tokens: int = 8, page_ms: int = 50,
+                 error_rate: float = 0.0, max_tokens: int = 1500, seed: int = 0):
+        self.ttft_ms = ttft_ms
+        self.chunk_ms = chunk_ms
+        self.chunk_tokens = chunk_tokens
+        self.page_ms = page_ms
+        self.error_rate = error_rate
+        self.max_tokens = max_tokens
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+
+def fake_analysis() -> dict:
+    return {
+        "summary": "公司季度营收超出预期，上调全年指引。",
+        "companies": [{"name": "示例公司", "impact": "positive", "reason": "业绩超预期。", "advice": "关注。"}],
+        "sectors": {key: {"impact": "neutral", "reason": "影响有限。", "advice": "观望。"} for key in SECTORS},
+        "risk": "宏观与利率变化可能带来波动。",
+    }
+
+
+def fake_completion(prompt: str, system: str, json_mode: bool, max_tokens: int) -> str:
+    """Deterministic stand-in output: a translation-sized text or an analysis."""
+    if system:
+        data = fake_analysis()
+        return json.dumps(data, ensure_ascii=False) if json_mode else render_analysis(data)
+    size = min(max_tokens, max(1, estimate_tokens(prompt) * 4 // 5))
+    words = []
+    while sum(len(w) for w in words) < size:
+        words.append(CN_WORDS[len(words) % len(CN_WORDS)])
+    return "".join(words)[:size]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    server_version = "FnaBench/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    @property
+    def config(self) -> FakeConfig:
+        return self.server.config
+
+    @property
+    def base(self) -> str:
+        return f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+
+    def send_body(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int):
+        self.send_body(json.dumps({"error": {"message": "injected error", "code": status}}).encode(),
+                       "application/json", status)
+
+    def start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def chunks(self, text: str):
+        """Yields text in chunk_tokens sized pieces, paced like a model."""
+        time.sleep(self.config.ttft_ms / 1000)
+        step = max(1, self.config.chunk_tokens)
+        for i in range(0, len(text), step):
+            if i:
+                time.sleep(self.config.chunk_ms / 1000)
+            yield text[i:i + step]
+
+    def write_chunk(self, data: str):
+        self.wfile.write(data.encode("utf-8"))
+        self.wfile.flush()
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        fixtures = self.server.fixtures
+        if path == "/rss":
+            self.send_body(fixtures.feed.replace("{base}", self.base).encode("utf-8"), "application/rss+xml")
+        elif path.startswith("/news/") and path[len("/news/"):] in fixtures.pages:
+            time.sleep(self.config.page_ms / 1000)
+            self.send_body(fixtures.pages[path[len("/news/"):]].encode("utf-8"), "text/html; charset=utf-8")
+        else:
+            self.send_body(b"Not found", "text/plain", 404)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if path.endswith("/chat/completions"):
+            return self.groq(request)
+        if ":generateContent" in path or ":streamGenerateContent" in path:
+            return self.gemini(request, stream=":streamGenerateContent" in path)
+        if path == "/api/generate":
+            return self.ollama(request)
+        self.send_body(b"Not found", "text/plain", 404)
+
+    def groq(self, request: dict):
+        if self.config.fail():
+            return self.send_error_json(self.config.rng.choice([429, 500, 503]))
+        system = "".join(m["content"] for m in request.get("messages", []) if m.get("role") == "system")
+        prompt = "".join(m["content"] for m in request.get("messages", []) if m.get("role") == "user")
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        text = fake_completion(prompt, system, json_mode, self.config.max_tokens)
+        usage = {"prompt_tokens": estimate_tokens(system + prompt), "completion_tokens": estimate_tokens(text)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": request.get("model", "")}
+        if not request.get("stream"):
+            time.sleep((self.config.ttft_ms + self.config.chunk_ms * len(text) / max(1, self.config.chunk_tokens)) / 1000)
+            body = {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}
+            return self.send_body(json.dumps(body).encode(), "application/json")
+        self.start_stream("text/event-stream")
+        for piece in self.chunks(text):
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}]}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        last = {**base, "object": "chat.completion.chunk", "x_groq": {"id": "bench", "usage": usage},
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.write_chunk(f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n")
+
+    def gemini(self, request: dict, stream: bool):
+        if self.config.fail():
+            return self.send_error_json(self.config.rng.choice([429, 500, 503]))
+        system = "".join(p.get("text", "") for p in (request.get("systemInstruction") or {}).get("parts", []))
+        prompt = "".join(p.get("text", "") for c in request.get("contents", []) for p in c.get("parts", []))
+        json_mode = (request.get("generationConfig") or {}).get("responseMimeType") == "application/json"
+        text = fake_completion(prompt, system, json_mode, self.config.max_tokens)
+        usage = {"promptTokenCount": estimate_tokens(system + prompt), "candidatesTokenCount": estimate_tokens(text)}
+        usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+
+        def response(piece: str, last: bool) -> dict:
+            candidate = {"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}
+            if last:
+                candidate["finishReason"] = "STOP"
+            return {"candidates": [candidate], **({"usageMetadata": usage} if last else {})}
+
+        if not stream:
+            time.sleep((self.config.ttft_ms + self.config.chunk_ms * len(text) / max(1, self.config.chunk_tokens)) / 1000)
+            return self.send_body(json.dumps(response(text, True)).encode(), "application/json")
+        # The REST transport reads a streamed JSON array
+        self.start_stream("application/json")
+        first = True
+        previous = None
+        for piece in self.chunks(text):
+            if previous is not None:
+                self.write_chunk(("[" if first else ",") + json.dumps(response(previous, False)))
+                first = False
+            previous = piece
+        self.write_chunk(("[" if first else ",") + json.dumps(response(previous or "", True)) + "]")
+
+    def ollama(self, request: dict):
+        if self.config.fail():
+            return self.send_body(json.dumps({"error": "injected error"}).encode(), "application/json", 500)
+        system = request.get("system", "")
+        prompt = request.get("prompt", "")
+        text = fake_completion(prompt, system, request.get("format") == "json", self.config.max_tokens)
+        usage = {"prompt_eval_count": estimate_tokens(system + prompt), "eval_count": estimate_tokens(text)}
+        base = {"model": request.get("model", ""), "created_at": datetime.now(timezone.utc).isoformat()}
+        if not request.get("stream", True):
+            time.sleep((self.config.ttft_ms + self.config.chunk_ms * len(text) / max(1, self.config.chunk_tokens)) / 1000)
+            return self.send_body(json.dumps({**base, "response": text, "done": True, **usage}).encode(),
+                                  "application/json")
+        self.start_stream("application/x-ndjson")
+        for piece in self.chunks(text):
+            self.write_chunk(json.dumps({**base, "response": piece, "done": False}) + "\n")
+        self.write_chunk(json.dumps({**base, "response": "", "done": True, **usage}) + "\n")
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures: Fixtures, config: FakeConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeHandler)
+        self.fixtures = fixtures
+        self.config = config
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class BenchScraper(YahooFinanceScraper):
+    """
+    The Yahoo scraper pointed at the fake server. Pages are fetched with
+    plain HTTP unless BENCH_BROWSER is set, which keeps Playwright in the
+    measurement.
+    """
+    def __init__(self):
+        super().__init__()
+        self.default_filter = f"{settings.BENCH_SERVER_URL}/news"
+
+    def get_feed_url(self):
+        return f"{settings.BENCH_SERVER_URL}/rss"
+
+    def extract_article(self, url):
+        if getattr(settings, "BENCH_BROWSER", False):
+            return super().extract_article(url)
+        import requests
+        try:
+            with metrics.stage("page_load"):
+                response = requests.get(url, timeout=30)
+                response.raise_for_status()
+            with metrics.stage("parse"):
+                return self.extract_article_content(response.text, url)
+        except Exception as e:
+            return {"url": url, "error": str(e)}
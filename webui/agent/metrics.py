@@ -0,0 +1,340 @@
+import os
+import glob
+import time
+import socket
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Crawler instrumentation: per-stage duration histograms, LLM time to first
+# token, token counts, cache hits and errors. Disabled by default; when
+# disabled every hook returns at its first line, so the crawler pays one
+# attribute lookup per stage. When enabled each crawler process writes its
+# metrics in the Prometheus text format to its own file in METRICS_DIR, with
+# a process="<host>-<pid>" label on every series, and logs a summary at the
+# end of each run. /fna/api/metrics/ merges the files with collect(). Queue
+# workers on other hosts need METRICS_DIR on shared storage to be included.
+ENABLED = getattr(settings, "METRICS_ENABLED", False) if settings.configured else False
+FLUSH_SECONDS = 15
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Raw samples kept per series for the percentiles of the run summary
+SAMPLES = 10000
+NULL_STAGE = nullcontext()
+# Files of processes that stopped writing this long ago are left out
+STALE_SECONDS = 24 * 3600
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def process_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def metrics_dir() -> str:
+    return str(getattr(settings, "METRICS_DIR", "crawler_metrics"))
+
+
+def metrics_file() -> str:
+    return os.path.join(metrics_dir(), f"{process_name()}.prom")
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Registry:
+    HELP = {
+        "fna_stage_seconds": ("histogram", "Duration of crawler stages."),
+        "fna_llm_ttft_seconds": ("histogram", "Time to the first streamed token of LLM calls."),
+        "fna_llm_seconds": ("histogram", "Duration of LLM calls."),
+        "fna_stage_errors_total": ("counter", "Stages that raised an exception."),
+        "fna_llm_calls_total": ("counter", "LLM calls."),
+        "fna_llm_errors_total": ("counter", "LLM calls that failed."),
+        "fna_llm_tokens_total": ("counter", "LLM tokens by kind, estimated when the provider does not report them."),
+        "fna_cache_hits_total": ("counter", "Work avoided through a cache."),
+        "fna_articles_total": ("counter", "Processed feed items by outcome."),
+        "fna_skipped_total": ("counter", "Feed items skipped before the LLM stages, by reason."),
+        "fna_time_to_analysis_seconds": ("histogram", "Time from publication to the saved analysis."),
+        "fna_stale_articles_total": ("counter", "Articles past their deadline, by action taken."),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = defaultdict(Histogram)
+        self.counters = defaultdict(float)
+        self.started = time.time()
+        self.flushed = 0.0
+
+    def observe(self, name: str, value: float, **labels):
+        with self.lock:
+            self.histograms[(name, tuple(sorted(labels.items())))].observe(value)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        with self.lock:
+            self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    def counter(self, name: str, **labels) -> float:
+        """Sum of the series of name that carry all the given labels."""
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(v for (n, l), v in self.counters.items() if n == name and wanted <= set(l))
+
+    def to_prometheus(self) -> str:
+        from webui.db import pool_stats
+        lines = []
+        base = (("process", process_name()),)
+        with self.lock:
+            names = sorted({n for n, _ in self.histograms} | {n for n, _ in self.counters})
+            for name in names:
+                kind, text = self.HELP.get(name, ("counter", ""))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (n, labels), h in sorted(self.histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{format_labels(base + labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{format_labels(base + labels + (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{name}_sum{format_labels(base + labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{format_labels(base + labels)} {h.count}")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{format_labels(base + labels)} {value:g}")
+        gauges = {f"fna_db_pool_{key}": f"{value:g}" for key, value in pool_stats().items()}
+        gauges["fna_metrics_updated_seconds"] = f"{time.time():.0f}"
+        for name, value in gauges.items():
+            lines += [f"# TYPE {name} gauge", f"{name}{format_labels(base)} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=None):
+        path = str(path or metrics_file())
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        # Readers never see a half-written file
+        os.replace(tmp, path)
+        self.flushed = time.monotonic()
+
+    def summary(self) -> str:
+        elapsed = time.time() - self.started
+        articles = self.counter("fna_articles_total")
+        lines = [f"Crawl summary: {articles:g} articles in {elapsed:.1f}s "
+                 f"({articles / elapsed if elapsed else 0:.2f} articles/s)"]
+        outcomes = sorted((dict(l).get("outcome", ""), v) for (n, l), v in self.counters.items()
+                          if n == "fna_articles_total")
+        if outcomes:
+            lines.append("  outcomes: " + ", ".join(f"{o}={v:g}" for o, v in outcomes))
+        skipped = sorted((dict(l).get("reason", ""), v) for (n, l), v in self.counters.items()
+                         if n == "fna_skipped_total")
+        if skipped:
+            lines.append("  skipped: " + ", ".join(f"{r}={v:g}" for r, v in skipped))
+        lines.append(f"  {'series':<32} {'count':>6} {'p50':>8} {'p95':>8} {'max':>8} {'total':>9}")
+        with self.lock:
+            for (name, labels), h in sorted(self.histograms.items()):
+                label = ",".join(str(v) for _, v in labels)
+                series = f"{name.removeprefix('fna_').removesuffix('_seconds')}[{label}]"
+                lines.append(f"  {series:<32} {h.count:>6} {h.quantile(0.5):>8.3f} {h.quantile(0.95):>8.3f} "
+                             f"{max(h.samples, default=0):>8.3f} {h.sum:>9.1f}")
+        for provider in sorted({dict(l).get("provider") for (n, l) in self.counters if n == "fna_llm_calls_total"}):
+            calls = self.counter("fna_llm_calls_total", provider=provider)
+            errors = self.counter("fna_llm_errors_total", provider=provider)
+            tokens = {kind: self.counter("fna_llm_tokens_total", provider=provider, kind=kind)
+                      for kind in ("prompt", "completion", "cached")}
+            lines.append(f"  {provider}: {calls:g} calls, {errors / calls if calls else 0:.1%} errors, "
+                         f"tokens prompt={tokens['prompt']:g} completion={tokens['completion']:g} "
+                         f"cached={tokens['cached']:g}")
+        hits = sorted((dict(l).get("cache", ""), v) for (n, l), v in self.counters.items() if n == "fna_cache_hits_total")
+        if hits:
+            lines.append("  cache hits: " + ", ".join(f"{c}={v:g}" for c, v in hits))
+        errors = sorted((dict(l).get("stage", ""), v) for (n, l), v in self.counters.items()
+                        if n == "fna_stage_errors_total")
+        if errors:
+            lines.append("  stage errors: " + ", ".join(f"{s}={v:g}" for s, v in errors))
+        return "\n".join(lines)
+
+
+REGISTRY = Registry()
+
+
+class Stage:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        REGISTRY.observe("fna_stage_seconds", time.perf_counter() - self.started, stage=self.name)
+        if exc_type is not None:
+            REGISTRY.incr("fna_stage_errors_total", stage=self.name)
+        return False
+
+
+def stage(name: str):
+    """Times a block as a pipeline stage: `with metrics.stage("translate"): ...`"""
+    if not ENABLED:
+        return NULL_STAGE
+    return Stage(name)
+
+
+def observe(name: str, value: float, **labels):
+    if ENABLED:
+        REGISTRY.observe(name, value, **labels)
+
+
+def incr(name: str, value: float = 1, **labels):
+    if ENABLED:
+        REGISTRY.incr(name, value, **labels)
+
+
+class LLMCall:
+    """
+    Measures one LLM request. Call first_token() when the first chunk
+    arrives, usage() with the token counts the provider reports, and
+    done() or failed() at the end.
+    """
+    enabled = True
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.tokens = {}
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def usage(self, prompt=None, completion=None, cached=None):
+        for kind, value in (("prompt", prompt), ("completion", completion), ("cached", cached)):
+            if value is not None:
+                self.tokens[kind] = value
+
+    def done(self, prompt: str = "", response: str = ""):
+        from webui.agent.utils import estimate_tokens
+        REGISTRY.observe("fna_llm_seconds", time.perf_counter() - self.started, provider=self.provider)
+        if self.ttft is not None:
+            REGISTRY.observe("fna_llm_ttft_seconds", self.ttft, provider=self.provider)
+        REGISTRY.incr("fna_llm_calls_total", provider=self.provider)
+        tokens = {"prompt": estimate_tokens(prompt), "completion": estimate_tokens(response), "cached": 0}
+        tokens.update(self.tokens)
+        for kind, value in tokens.items():
+            REGISTRY.incr("fna_llm_tokens_total", value, provider=self.provider, kind=kind)
+
+    def failed(self):
+        REGISTRY.incr("fna_llm_calls_total", provider=self.provider)
+        REGISTRY.incr("fna_llm_errors_total", provider=self.provider)
+
+
+class NullCall:
+    enabled = False
+
+    def first_token(self):
+        pass
+
+    def usage(self, prompt=None, completion=None, cached=None):
+        pass
+
+    def done(self, prompt: str = "", response: str = ""):
+        pass
+
+    def failed(self):
+        pass
+
+
+NULL_CALL = NullCall()
+
+
+def llm_call(provider: str):
+    return LLMCall(provider) if ENABLED else NULL_CALL
+
+
+def flush(force: bool = False):
+    """Writes this process's metrics file, at most every FLUSH_SECONDS unless forced."""
+    if not ENABLED:
+        return
+    if force or time.monotonic() - REGISTRY.flushed >= FLUSH_SECONDS:
+        try:
+            REGISTRY.write()
+        except OSError as e:
+            logger.warning(f"Cannot write metrics to {metrics_file()}: {e}")
+
+
+def report():
+    """Logs the run summary and writes the final metrics."""
+    if not ENABLED:
+        return
+    logger.info(REGISTRY.summary())
+    flush(force=True)
+
+
+def collect(directory: str = None, max_age: float = STALE_SECONDS) -> str:
+    """
+    Merges the files of all crawler processes in directory into a single
+    exposition, with the series of each metric grouped under one HELP and
+    TYPE header. Returns an empty string when there is nothing to serve.
+    """
+    families = {}
+    now = time.time()
+    for path in sorted(glob.glob(os.path.join(directory or metrics_dir(), "*.prom"))):
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                continue
+            with open(path) as f:
+                text = f.read()
+        except OSError:
+            continue
+        family = None
+        for line in text.splitlines():
+            if line.startswith(("# HELP ", "# TYPE ")):
+                kind, family = line.split(" ", 3)[1:3]
+                families.setdefault(family, {"header": {}, "samples": []})["header"].setdefault(kind, line)
+            elif line and family is not None:
+                families[family]["samples"].append(line)
+    lines = []
+    for family in families.values():
+        lines += [family["header"][k] for k in ("HELP", "TYPE") if k in family["header"]]
+        lines += family["samples"]
+    return "\n".join(lines) + "\n" if lines else ""
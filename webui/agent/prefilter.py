@@ -0,0 +1,113 @@
+import re
+import logging
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Weighted terms that indicate an article can move stocks.
+MARKET_KEYWORDS = {
+    "earnings": 3, "revenue": 2, "profit": 2, "guidance": 3, "forecast": 1,
+    "quarter": 1, "quarterly": 2, "dividend": 2, "buyback": 3, "shares": 2,
+    "stock": 2, "stocks": 2, "investors": 1, "analyst": 2, "analysts": 2,
+    "downgrade": 3, "upgrade": 3, "price target": 3, "ipo": 3, "merger": 3,
+    "acquisition": 3, "acquire": 2, "layoffs": 2, "bankruptcy": 3, "lawsuit": 1,
+    "federal reserve": 3, "the fed": 3, "interest rate": 3, "rate cut": 3,
+    "rate hike": 3, "inflation": 2, "cpi": 2, "gdp": 2, "jobs report": 3,
+    "tariff": 2, "tariffs": 2, "treasury": 2, "yields": 2, "bond": 1,
+    "oil prices": 3, "crude": 2, "opec": 3, "s&p 500": 3, "nasdaq": 2,
+    "dow jones": 2, "market cap": 2, "sec": 1, "fda": 2, "chip": 1,
+    "semiconductor": 2, "bank": 1, "banks": 1, "airline": 1, "airlines": 1,
+}
+
+# Terms typical of lifestyle or promotional pieces.
+LOW_VALUE_KEYWORDS = {
+    "sponsored": 4, "advertisement": 4, "promo code": 4, "coupon": 3,
+    "best credit cards": 4, "credit card offers": 4, "savings account rates": 3,
+    "cd rates": 3, "mortgage rates today": 3, "deal of the day": 4,
+    "recipe": 3, "horoscope": 4, "celebrity": 2, "wedding": 2, "vacation tips": 3,
+    "how to save money": 3, "personal finance tips": 3, "shop now": 4,
+}
+
+# Well known listed companies, matched by name.
+COMPANY_NAMES = [
+    "apple", "microsoft", "nvidia", "amazon", "alphabet", "google", "meta",
+    "tesla", "broadcom", "netflix", "intel", "amd", "oracle", "salesforce",
+    "jpmorgan", "goldman sachs", "morgan stanley", "bank of america", "wells fargo",
+    "citigroup", "berkshire", "visa", "mastercard", "exxon", "chevron",
+    "conocophillips", "boeing", "delta", "united airlines", "american airlines",
+    "marriott", "hilton", "booking holdings", "expedia", "pfizer", "moderna",
+    "johnson & johnson", "eli lilly", "novo nordisk", "unitedhealth", "merck",
+    "walmart", "costco", "target", "disney", "coca-cola", "pepsico", "nike",
+]
+
+TICKER_PATTERNS = [
+    re.compile(r"\((?:NYSE|NASDAQ|Nasdaq|NYSEAMERICAN|AMEX|TSX)\s*:\s*[A-Z.]{1,6}\)"),
+    re.compile(r"\$[A-Z]{1,5}\b"),
+    re.compile(r"\(([A-Z]{1,5})\)"),
+]
+
+# Parenthesised abbreviations that are not tickers.
+TICKER_STOPWORDS = {"AP", "AI", "US", "UK", "EU", "CEO", "CFO", "GDP", "CPI", "SEC", "FDA", "ETF", "IPO"}
+
+
+class RelevanceFilter:
+    """
+    Cheap local scoring that decides whether an article is worth sending to
+    the translator and the analyzer.
+    """
+    def __init__(self, threshold: int = None):
+        self.threshold = threshold if threshold is not None else getattr(settings, "PREFILTER_THRESHOLD", 4)
+        self.company_pattern = re.compile(
+            r"\b(" + "|".join(re.escape(name) for name in COMPANY_NAMES) + r")\b"
+        )
+        self.market_patterns = self._compile(MARKET_KEYWORDS)
+        self.low_value_patterns = self._compile(LOW_VALUE_KEYWORDS)
+
+    def _compile(self, keywords: dict) -> list:
+        return [(k, w, re.compile(r"\b" + re.escape(k) + r"\b")) for k, w in keywords.items()]
+
+    def _keyword_score(self, text: str, patterns: list) -> tuple[int, list[str]]:
+        score = 0
+        hits = []
+        for keyword, weight, pattern in patterns:
+            if pattern.search(text):
+                score += weight
+                hits.append(keyword)
+        return score, hits
+
+    def score(self, title: str, content: str) -> tuple[int, list[str]]:
+        """
+        Returns the relevance score and the signals that contributed to it.
+        """
+        text = f"{title}\n{content}"
+        lowered = text.lower()
+        signals = []
+        market_score, market_hits = self._keyword_score(lowered, self.market_patterns)
+        low_score, low_hits = self._keyword_score(lowered, self.low_value_patterns)
+        signals += [f"+{k}" for k in market_hits] + [f"-{k}" for k in low_hits]
+
+        tickers = set()
+        for pattern in TICKER_PATTERNS:
+            tickers.update(t for t in pattern.findall(text) if t.strip("$") not in TICKER_STOPWORDS)
+        companies = set(self.company_pattern.findall(lowered))
+        if tickers:
+            signals.append(f"tickers:{len(tickers)}")
+        if companies:
+            signals.append(f"companies:{','.join(sorted(companies))}")
+
+        total = market_score - low_score + 3 * min(len(tickers), 3) + 2 * min(len(companies), 3)
+        return total, signals
+
+    def check(self, title: str, content: str) -> tuple[bool, str]:
+        """
+        Returns (relevant, reason). The reason is empty for relevant articles.
+        """
+        if not content or not content.strip():
+            return False, "empty_content"
+        total, signals = self.score(title, content)
+        logger.debug(f"Relevance score {total} for '{title}': {signals}")
+        if total < self.threshold:
+            if any(s.startswith("-") for s in signals):
+                return False, "promotional"
+            return False, "low_relevance"
+        return True, ""
@@ -0,0 +1,184 @@
+import os
+import socket
+import threading
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from webui.agent import metrics
+from webui.models import CrawlJob
+
+logger = logging.getLogger(__name__)
+
+# Distributed crawling: one scheduler enqueues feed items into crawl_jobs,
+# any number of worker processes on any number of hosts claim them with
+# SELECT ... FOR UPDATE SKIP LOCKED. A claimed job is leased to its worker,
+# the lease is renewed while the worker is busy, and a job whose worker died
+# is claimed again once its lease expires, up to CRAWL_MAX_ATTEMPTS times.
+# Finished jobs are deleted CRAWL_JOB_RETENTION_DAYS after they finished.
+LEASE_SECONDS = getattr(settings, "CRAWL_LEASE_SECONDS", 900)
+MAX_ATTEMPTS = getattr(settings, "CRAWL_MAX_ATTEMPTS", 3)
+POLL_SECONDS = getattr(settings, "CRAWL_POLL_SECONDS", 10)
+RETENTION_DAYS = getattr(settings, "CRAWL_JOB_RETENTION_DAYS", 7)
+
+
+def enqueue(pipeline) -> int:
+    """
+    Adds the current feed items that are not in the archive yet, with their
+    freshness priority and deadline. URLs that already have a job are
+    ignored. Returns the number of items offered.
+    """
+    scheduler = pipeline.scheduler
+    items = [i for i in pipeline.rss_scraper.list_feed_items() if i.get('link')]
+    jobs = [
+        CrawlJob(url=i['link'], title=i.get('title') or '', published=i.get('published') or '',
+                 priority=scheduler.priority(i), deadline=scheduler.deadline(i))
+        for i in items if not pipeline.is_dup(i['link'])
+    ]
+    CrawlJob.objects.bulk_create(jobs, ignore_conflicts=True)
+    expire_leases()
+    prune()
+    return len(jobs)
+
+
+def expire_leases() -> int:
+    """Fails jobs whose last allowed attempt died without finishing."""
+    return (CrawlJob.objects
+            .filter(status=CrawlJob.RUNNING, lease_until__lt=timezone.now(), attempts__gte=MAX_ATTEMPTS)
+            .update(status=CrawlJob.FAILED, last_error='Lease expired', lease_until=None, updated_at=timezone.now()))
+
+
+def prune() -> int:
+    """
+    Deletes done and failed jobs older than RETENTION_DAYS, so the table
+    only holds recent history. A pruned failed URL that is still in the feed
+    is enqueued again.
+    """
+    cutoff = timezone.now() - timedelta(days=RETENTION_DAYS)
+    deleted, _ = (CrawlJob.objects.filter(status__in=[CrawlJob.DONE, CrawlJob.FAILED], updated_at__lt=cutoff)
+                  .delete())
+    return deleted
+
+
+def claim(worker_id: str):
+    """
+    Claims the freshest job for worker_id, or returns None when there is
+    none. Rows locked by other workers are skipped instead of waited for.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (CrawlJob.objects.select_for_update(skip_locked=True)
+               .filter(Q(status=CrawlJob.PENDING) | Q(status=CrawlJob.RUNNING, lease_until__lt=now),
+                       attempts__lt=MAX_ATTEMPTS)
+               .order_by('-priority', 'id').first())
+        if job is None:
+            return None
+        job.status = CrawlJob.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.lease_until = now + timedelta(seconds=LEASE_SECONDS)
+        job.save(update_fields=['status', 'attempts', 'locked_by', 'lease_until', 'updated_at'])
+    return job
+
+
+def renew(job, worker_id: str) -> bool:
+    """Extends the lease. False means the job was taken over by another worker."""
+    return bool(CrawlJob.objects
+                .filter(id=job.id, locked_by=worker_id, status=CrawlJob.RUNNING)
+                .update(lease_until=timezone.now() + timedelta(seconds=LEASE_SECONDS)))
+
+
+def finish(job, worker_id: str, outcome: str, error: str = ""):
+    if outcome == "failed":
+        status = CrawlJob.PENDING if job.attempts < MAX_ATTEMPTS else CrawlJob.FAILED
+    else:
+        status = CrawlJob.DONE
+    (CrawlJob.objects.filter(id=job.id, locked_by=worker_id)
+     .update(status=status, outcome=outcome, last_error=error, lease_until=None, updated_at=timezone.now()))
+
+
+class Lease:
+    """Renews the lease of a job from a background thread while it runs."""
+    def __init__(self, job, worker_id: str):
+        self.job = job
+        self.worker_id = worker_id
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.keep_alive, daemon=True)
+
+    def keep_alive(self):
+        try:
+            while not self.done.wait(LEASE_SECONDS / 3):
+                if not renew(self.job, self.worker_id):
+                    logger.warning(f"Lost the lease of job {self.job.id}")
+                    return
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.done.set()
+        self.thread.join()
+
+
+class QueueWorker:
+    """
+    Runs `threads` claim/process loops in this process. With once=True the
+    loops stop when the queue is empty instead of polling for new jobs.
+    """
+    def __init__(self, pipeline, threads: int = 1, once: bool = False):
+        self.pipeline = pipeline
+        self.threads = threads
+        self.once = once
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+    def run(self):
+        workers = [threading.Thread(target=self.loop, args=(n,)) for n in range(self.threads)]
+        for w in workers:
+            w.start()
+        try:
+            for w in workers:
+                while w.is_alive():
+                    w.join(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping after the current jobs...")
+            self.stopping.set()
+            for w in workers:
+                w.join()
+        metrics.report()
+        return self.processed
+
+    def loop(self, n: int):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{n}"
+        try:
+            while not self.stopping.is_set():
+                job = claim(worker_id)
+                if job is None:
+                    connection.close()
+                    if self.once:
+                        return
+                    self.stopping.wait(POLL_SECONDS)
+                    continue
+                self.process(job, worker_id)
+        finally:
+            connection.close()
+
+    def process(self, job, worker_id: str):
+        logger.info(f"[{worker_id}] Job {job.id} attempt {job.attempts}: {job.url}")
+        error = ""
+        with Lease(job, worker_id):
+            try:
+                outcome = self.pipeline.process_article({'link': job.url, 'title': job.title, 'published': job.published,
+                                                          'deadline': job.deadline})
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                outcome, error = "failed", str(e)
+        finish(job, worker_id, outcome or "failed", error)
+        with self.lock:
+            self.processed += 1
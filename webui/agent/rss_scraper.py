@@ -1,14 +1,13 @@
-import feedparser
 from abc import ABC, abstractmethod
-from playwright.sync_api import sync_playwright
 import argparse
 import textwrap
-from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from datetime import datetime
 import logging
 import re
+from webui.agent import metrics
+from webui.agent.utils import load_provider, UnknownProvider
 logger = logging.getLogger(__name__)
 
 # ===== Base class and Yahoo implementation =====
@@ -34,7 +33,9 @@ class BaseRSSScraper(ABC):
         return filtered_articles
 
     def fetch_feed(self):
-        feed = feedparser.parse(self.feed_url)
+        import feedparser
+        with metrics.stage("feed"):
+            feed = feedparser.parse(self.feed_url)
         self.entries = self._apply_filter(feed.entries)
         return self.entries
 
@@ -86,6 +87,7 @@ class YahooFinanceScraper(BaseRSSScraper):
     
     
     def extract_article_content(self, html, url):
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, "html.parser")
         # 1. Title
         title_tag = soup.select_one(".cover-title")
@@ -115,27 +117,36 @@ class YahooFinanceScraper(BaseRSSScraper):
 
 
     def extract_article(self, url):
+        from playwright.sync_api import sync_playwright
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
             try:
-                page.goto(url, timeout=30000, wait_until="domcontentloaded")
-                #page.wait_for_selector('#nimbus-app > section > section > section > article', timeout=30000)
-                page.wait_for_load_state('domcontentloaded', timeout=60000)
-                #page.wait_for_selector('main > section > section > section > section > article', timeout=60000)
-                html = page.content()
-                return self.extract_article_content(html, url)
+                with metrics.stage("page_load"):
+                    page.goto(url, timeout=30000, wait_until="domcontentloaded")
+                    #page.wait_for_selector('#nimbus-app > section > section > section > article', timeout=30000)
+                    page.wait_for_load_state('domcontentloaded', timeout=60000)
+                    #page.wait_for_selector('main > section > section > section > section > article', timeout=60000)
+                    html = page.content()
+                with metrics.stage("parse"):
+                    return self.extract_article_content(html, url)
             except Exception as e:
                 return {"url": url, "error": str(e)}
             finally:
                 browser.close()
 
 
+RSS_SCRAPERS = {
+    "yahoo": "webui.agent.rss_scraper.YahooFinanceScraper",
+}
+
+
 def get_rss_scraper(rss_name: str):
-    if rss_name == "yahoo":
-        return YahooFinanceScraper()
-    else:
+    try:
+        scraper_class = load_provider(RSS_SCRAPERS, rss_name, "RSS_SCRAPER_REGISTRY")
+    except UnknownProvider:
         raise Exception(f"Unsupported RSS scraper: {rss_name}")
+    return scraper_class()
     
 
 # ===== CLI Entrypoint =====
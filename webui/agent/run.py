@@ -2,9 +2,21 @@
 from webui.agent.rss_scraper import get_rss_scraper
 from webui.agent.translator import get_translator
 from webui.agent.analyzer import get_analyzer
+from webui.agent.prefilter import RelevanceFilter
+from webui.agent.scheduler import FreshnessScheduler, parse_published
+from webui.agent import simhash, metrics
+from webui.agent.analysis import parse_analysis, render_analysis, save_analysis
+from webui.stream import notify_article
+from webui.cache import bump_generation
+from webui.archive import restore_content
+from webui.db import pool_stats
 from concurrent.futures import ThreadPoolExecutor
-from webui.models import NewsArticles
+from collections import Counter
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from webui.models import NewsArticles, NewsFingerprint, SkippedArticle
 import logging
+import threading
 from django.conf import settings
 from django.utils.timezone import now
 
@@ -19,66 +31,231 @@ class Pipeline:
         self.workers = workers
         self.tasks = []
         self.test = test
-        
+        self.prefilter = RelevanceFilter() if getattr(settings, "PREFILTER_ENABLED", True) else None
+        self.prefilter_action = getattr(settings, "PREFILTER_ACTION", "skip")
+        self.scheduler = FreshnessScheduler()
+        self.skipped = Counter()
+        self.lock = threading.Lock()
+
+    def record_skip(self, reason: str, url: str, persist: bool = True):
+        with self.lock:
+            self.skipped[reason] += 1
+        metrics.incr("fna_skipped_total", reason=reason)
+        logger.info(f"Skip {url}: {reason}")
+        if persist and not self.test:
+            # Remembered, so is_dup keeps the item from being extracted again
+            SkippedArticle.objects.bulk_create([SkippedArticle(url=url, reason=reason)], ignore_conflicts=True)
+
     def is_dup(self, source_url: str) -> bool:
         if not source_url:
             return False
-        qs = NewsArticles.objects.filter(source_url=source_url)
-        return qs.exists()
+        if NewsArticles.objects.filter(source_url=source_url).exists():
+            return True
+        return SkippedArticle.objects.filter(url=source_url).exists()
         
+    def find_near_dup(self, fingerprint: int):
+        """
+        Returns an analyzed article whose content SimHash is within
+        simhash.MAX_DISTANCE bits of fingerprint, looked up by LSH band.
+        """
+        band_match = Q()
+        for i, band in enumerate(simhash.bands(fingerprint)):
+            band_match |= Q(**{f"band{i}": band})
+        candidates = NewsFingerprint.objects.filter(band_match).exclude(article__result="")
+        for candidate in candidates.select_related('article'):
+            if simhash.hamming(fingerprint, simhash.to_unsigned(candidate.simhash)) <= simhash.MAX_DISTANCE:
+                return restore_content(candidate.article)
+        return None
+
+    def save_fingerprint(self, article: NewsArticles, fingerprint: int):
+        b = simhash.bands(fingerprint)
+        NewsFingerprint.objects.create(
+            article=article, simhash=simhash.to_signed(fingerprint),
+            band0=b[0], band1=b[1], band2=b[2], band3=b[3],
+        )
+
+    def save(self, article: dict, translated_title: str, translated_content: str, analysis_result: str,
+             fingerprint: int = None, analysis: dict = None):
+        logger.info("Save to database...")
+        a = NewsArticles(
+            title = article['title'],
+            cn_title = translated_title,
+            original_content = article['content'],
+            source_url = article['url'],
+            source_name = settings.RSS_SCRAPER,
+            publish_date = article['published'],
+            crawl_date = now(),
+            result = analysis_result,
+            translated_content = translated_content,
+            created_at = now(),
+            author = article['author'],
+            translator = settings.TRANSLATOR,
+            analyzer = settings.ANALYZER,
+        )
+        try:
+            with metrics.stage("save"), transaction.atomic():
+                a.save()
+                if fingerprint is not None:
+                    self.save_fingerprint(a, fingerprint)
+                if analysis is not None:
+                    save_analysis(a, analysis)
+            # Each save is its own persist batch, so cached reads pick it up at once
+            bump_generation()
+            if analysis_result:
+                notify_article(a, analysis["summary"] if analysis else "")
+        except IntegrityError:
+            # source_url is unique: another worker saved the same article first
+            logger.info(f"Already saved by another worker: {article['url']}")
+            return None
+        except Exception as e:
+            logger.error(e)
+            return None
+        logger.info("Save to database done.")
+        return a
+
+    def save_light(self, article: dict):
+        # Keep the article with a translated title only, so is_dup
+        # stops it from being scraped again on the next run.
+        return self.save(article, self.translator.translate_text(article['title']), None, "")
+
+    def process_in_worker(self, article) -> str:
+        try:
+            return self.process_article(article)
+        except Exception:
+            # Nobody reads the futures, so the error would be lost
+            logger.exception(f"Failed to process {article.get('link')}")
+            metrics.incr("fna_articles_total", outcome="failed")
+            return "failed"
+        finally:
+            # Hand the thread's connection back to the pool
+            connection.close()
+
     def run(self):
-        self.articles = self.rss_scraper.list_feed_items()
+        # Newest first, so fresh news does not wait behind a backlog
+        self.articles = self.scheduler.order(self.rss_scraper.list_feed_items())
         if not self.articles:
             logger.info("No articles to process after fetching and filtering. Exiting run.")
         if self.workers > 1:
+            stats = pool_stats()
+            if stats and self.workers > stats['max_size']:
+                logger.warning(f"{self.workers} workers share {stats['max_size']} pooled connections, "
+                               "workers may wait for a connection.")
             with ThreadPoolExecutor(max_workers=self.workers) as executor:
                 for article in self.articles:
-                    self.tasks.append(executor.submit(self.process_article, article))
+                    self.tasks.append(executor.submit(self.process_in_worker, article))
         else:
             for article in self.articles:
                     self.process_article(article)
+        if self.skipped:
+            summary = ", ".join(f"{reason}={count}" for reason, count in self.skipped.most_common())
+            logger.info(f"Skipped {sum(self.skipped.values())} of {len(self.articles)} articles: {summary}")
+        stats = pool_stats()
+        if stats:
+            logger.info(f"Connection pool: {stats}")
+        metrics.report()
 
-    def process_article(self, article):
+    def process_article(self, article) -> str:
+        """
+        Processes one feed item. Returns the outcome: "saved", "duplicate",
+        "skipped" or "failed". Only "failed" is worth retrying.
+        """
+        with metrics.stage("article"):
+            outcome = self.process_item(article)
+        metrics.incr("fna_articles_total", outcome=outcome)
+        metrics.flush()
+        return outcome
+
+    def process_item(self, article) -> str:
         logger.info(f"Processing {article['link']}")
         # Check database
         logger.info("Check duplication...")
-        if self.is_dup(article['link']):
+        with metrics.stage("dedup"):
+            exists = self.is_dup(article['link'])
+        if exists:
             logger.info(f"Data exist for URL: {article['link']}")
-            return
+            return "duplicate"
 
         if self.test:
             logger.info("Skip duplication check")
         else:
             pass
+        stale = self.scheduler.is_stale(article)
+        if stale and self.scheduler.stale_action == "drop":
+            self.record_skip("stale", article['link'])
+            metrics.incr("fna_stale_articles_total", action="drop")
+            return "skipped"
         # Extract Content
         logger.info("Extract content...")
-        a2 = self.rss_scraper.extract_article(article['link'])
+        with metrics.stage("extract"):
+            a2 = self.rss_scraper.extract_article(article['link'])
         keys_to_check = ['content', 'author', 'title', 'url', 'published']
         if not a2:
-            logger.warnning(f"WARNING: Failed to extract content for '{article['title']}'. Skipping analysis.")
-            return
+            logger.warning(f"WARNING: Failed to extract content for '{article['title']}'. Skipping analysis.")
+            return "failed"
         if not all(key in a2 for key in keys_to_check):
             logger.warning(f"WARNING: Failed to extract content for '{article['title']}'. Not all keys available Skipping analysis.")
             logger.debug(a2)
-            return
+            return "failed"
         logger.debug(a2)
         content = a2['content']
-        author = a2['author']
         title = a2['title']
         url = a2['url']
         published = a2['published']
+        # Relevance pre-filter, before any LLM spend
+        if self.prefilter:
+            with metrics.stage("prefilter"):
+                relevant, reason = self.prefilter.check(title, content)
+            if not relevant:
+                self.record_skip(reason, article['link'])
+                if self.prefilter_action == "light" and not self.test:
+                    self.save_light(a2)
+                return "skipped"
+        # Near-duplicate of an analyzed story from another URL: reuse its results
+        with metrics.stage("near_dup"):
+            fingerprint = simhash.simhash(content)
+            dup = self.find_near_dup(fingerprint)
+        if dup:
+            self.record_skip("near_duplicate", url, persist=False)
+            metrics.incr("fna_cache_hits_total", cache="near_duplicate")
+            logger.info(f"Reuse translation and analysis of article {dup.id} for {url}")
+            if not self.test:
+                analysis = dup.analysis.to_dict() if hasattr(dup, 'analysis') else None
+                self.save(a2, dup.cn_title, dup.translated_content, dup.result, fingerprint, analysis)
+            return "duplicate"
+        # Past its deadline: only the cheap path, the LLM budget goes to fresh news
+        if stale or self.scheduler.is_stale(article):
+            action = self.scheduler.stale_action
+            self.record_skip("stale", article['link'])
+            metrics.incr("fna_stale_articles_total", action=action)
+            if action == "light" and not self.test:
+                self.save_light(a2)
+            return "skipped"
+        # Do not hold a pooled connection through the slow LLM calls
+        connection.close()
         # Translate content
         logger.info("Translating article content to Chinese...")
-        translated_content = self.translator.translate_text(content)
-        translated_title = self.translator.translate_text(title)
+        with metrics.stage("translate"):
+            translated_content = self.translator.translate_text(content)
+            translated_title = self.translator.translate_text(title)
         logger.debug(translated_content)
         logger.debug(translated_title)
         if not translated_content:
-            logger.warnning(f"Warning: Failed to translate content for '{title}'. Skipping analysis.")
-            return
+            logger.warning(f"Warning: Failed to translate content for '{title}'. Skipping analysis.")
+            return "failed"
         # Analyze news impact
         logger.info("Analyzing news impact with AI...")
-        analysis_result = self.ai_analyzer.analyze_news_impact(translated_title, translated_content)
+        with metrics.stage("analyze"):
+            analysis_result = self.ai_analyzer.analyze_news_impact(translated_title, translated_content)
+        analysis = None
+        if analysis_result and self.ai_analyzer.structured:
+            try:
+                analysis = parse_analysis(analysis_result)
+                analysis_result = render_analysis(analysis)
+            except ValueError as e:
+                # Raw text would not match the rendered layout or the impact
+                # tables, so the article is left for a later retry instead
+                logger.warning(f"Invalid structured analysis for '{title}': {e}")
+                analysis_result = ""
         if analysis_result:
             if self.test:
                 logger.info(f"url: {url}")
@@ -89,29 +266,14 @@ class Pipeline:
                 logger.info(f"cn_content: {translated_content}")
                 logger.info(f"Analysis:\n{analysis_result}")
             else:
-                logger.info("Save to database...")
-                a = NewsArticles(
-                    title = title,
-                    cn_title = translated_title,
-                    original_content = content,
-                    source_url = url,
-                    source_name = settings.RSS_SCRAPER,
-                    publish_date = published,
-                    crawl_date = now(),
-                    result = analysis_result,
-                    translated_content = translated_content,
-                    created_at = now(),
-                    author = author,
-                    translator = settings.TRANSLATOR,
-                    analyzer = settings.ANALYZER,
-                )
-                try:
-                    a.save()
-                except Exception as e:
-                    logger.error(e)
-                logger.info("Save to database done.")
-        else:
-            logger.error(f"Failed to get analysis for '{article['title']}'.")
+                if not self.save(a2, translated_title, translated_content, analysis_result, fingerprint, analysis):
+                    return "duplicate" if self.is_dup(a2['url']) else "failed"
+                published_at = parse_published(published) or parse_published(article.get('published'))
+                if published_at:
+                    metrics.observe("fna_time_to_analysis_seconds", (now() - published_at).total_seconds())
+            return "saved"
+        logger.error(f"Failed to get analysis for '{article['title']}'.")
+        return "failed"
 
 
 if __name__ == "__main__":
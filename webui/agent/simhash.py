@@ -0,0 +1,54 @@
+import re
+import hashlib
+
+# 64 bit fingerprints split into 4 bands of 16 bits. Two fingerprints within
+# a Hamming distance of 3 always share at least one band (pigeonhole), so an
+# exact match on any band is enough to find every candidate.
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> list[str]:
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    Returns the unsigned 64 bit SimHash of the word shingles of text.
+    """
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def bands(fingerprint: int) -> list[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(BANDS)]
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64 bit value onto a Postgres bigint."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
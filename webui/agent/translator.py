@@ -1,16 +1,13 @@
 import requests
 import argparse
 import json
-from libretranslatepy import LibreTranslateAPI
-from googletrans import Translator
 import logging
 import asyncio
 import sys
 import re
 from django.conf import settings
-from webui.agent.utils import gemini_gen, groq_gen
-import google.generativeai as genai
-from groq import Groq
+from webui.agent import metrics
+from webui.agent.utils import configure_gemini, gemini_gen, groq_gen, load_provider, UnknownProvider
 
 
 logger = logging.getLogger(__name__)
@@ -34,6 +31,7 @@ class GenAITranslator(BaseTranslator):
 
 class GroqTranslator(GenAITranslator):
     def __init__(self):
+        from groq import Groq
         self.client = Groq(api_key=settings.GROQ_API_KEY)
         self.model = settings.GROQ_TRANS_MODEL
     
@@ -43,7 +41,8 @@ class GroqTranslator(GenAITranslator):
 
 class GeminiTranslator(GenAITranslator):
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
+        import google.generativeai as genai
+        configure_gemini(genai)
         self.model = genai.GenerativeModel(settings.GEMINI_TRANS_MODEL)
     
     def translate_text(self, text: str) -> str:
@@ -66,23 +65,32 @@ class OllamaTranslator(GenAITranslator):
             "prompt": self.get_prompt(text),
             "stream": True
         }
-        response = requests.post(self.host, headers=headers, data=json.dumps(payload), stream=True, timeout=120)
-        response.raise_for_status()
-        translated_chunks = []
-        for line in response.iter_lines():
-            if line:
-                decoded_line = line.decode('utf-8')
-                json_line = json.loads(decoded_line)
-                if 'response' in json_line:
-                    translated_chunks.append(json_line['response'])
-                if json_line.get('done'):
-                    break
+        call = metrics.llm_call("ollama")
+        try:
+            response = requests.post(self.host, headers=headers, data=json.dumps(payload), stream=True, timeout=120)
+            response.raise_for_status()
+            translated_chunks = []
+            for line in response.iter_lines():
+                if line:
+                    decoded_line = line.decode('utf-8')
+                    json_line = json.loads(decoded_line)
+                    if 'response' in json_line:
+                        call.first_token()
+                        translated_chunks.append(json_line['response'])
+                    if json_line.get('done'):
+                        call.usage(prompt=json_line.get('prompt_eval_count'), completion=json_line.get('eval_count'))
+                        break
+        except Exception:
+            call.failed()
+            raise
         tc = "".join(translated_chunks).strip()
+        call.done(payload["prompt"], tc)
         return self.remove_think_tag(tc)
 
 
 class LibreTranslator(BaseTranslator):
     def __init__(self):
+        from libretranslatepy import LibreTranslateAPI
         self.lt = LibreTranslateAPI("https://libretranslate.com/")
         
         
@@ -92,6 +100,7 @@ class LibreTranslator(BaseTranslator):
 
 class GoogleTranslator(BaseTranslator):
     def __init__(self):
+        from googletrans import Translator
         self.translator = Translator()
         
     async def _google_translate(self, text: str):
@@ -105,20 +114,24 @@ class GoogleTranslator(BaseTranslator):
         return asyncio.run(self._google_translate(text))
     
 
+# Provider SDKs are imported in each constructor, so only the configured
+# translator pays for its imports.
+TRANSLATORS = {
+    "ollama": "webui.agent.translator.OllamaTranslator",
+    "libre": "webui.agent.translator.LibreTranslator",
+    "google": "webui.agent.translator.GoogleTranslator",
+    "gemini": "webui.agent.translator.GeminiTranslator",
+    "groq": "webui.agent.translator.GroqTranslator",
+}
+
+
 def get_translator(translator_name: str):
     logger.debug(f'Translator: {translator_name}')
-    if translator_name == "ollama":
-        return OllamaTranslator()
-    elif translator_name == "libre":
-        return LibreTranslator()
-    elif translator_name == "google":
-        return GoogleTranslator()
-    elif translator_name == "gemini":
-        return GeminiTranslator()
-    elif translator_name == "groq":
-        return GroqTranslator()
-    else:
+    try:
+        translator_class = load_provider(TRANSLATORS, translator_name, "TRANSLATOR_REGISTRY")
+    except UnknownProvider:
         raise Exception(f"[!] Unsupported translator: {translator_name}")
+    return translator_class()
 
 
 def main():
@@ -1,20 +1,124 @@
 from typing import Iterator
 import logging
+import re
+from django.conf import settings
+from django.utils.module_loading import import_string
+from webui.agent import metrics
 
 logger = logging.getLogger(__name__)
 
 
+class UnknownProvider(Exception):
+    pass
+
+
+def load_provider(registry: dict, name: str, setting: str = ""):
+    """
+    Resolve a provider class by name without importing the other providers.
+    A project can extend or override the built-in registry through a dict
+    setting (e.g. TRANSLATOR_REGISTRY), and a dotted path is accepted as name.
+    Raises UnknownProvider for a name that is not registered, and ImportError
+    naming the configured path when that path cannot be imported.
+    """
+    configured = getattr(settings, setting, {}) if setting and settings.configured else {}
+    providers = {**registry, **configured}
+    path = providers.get(name)
+    if path is None and "." in name:
+        path = name
+    if path is None:
+        raise UnknownProvider(f"Unsupported provider: {name}")
+    try:
+        return import_string(path)
+    except ImportError as e:
+        source = f" (from {setting})" if name in configured else ""
+        raise ImportError(f"Cannot import provider {name!r} from {path!r}{source}: {e}") from e
+
+
+CJK_PATTERN = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+SENTENCE_PATTERN = re.compile(r"[^。！？!?\n]+[。！？!?]?")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without a tokenizer: one token per CJK character,
+    4/3 tokens per latin word and one per remaining punctuation mark.
+    """
+    if not text:
+        return 0
+    cjk = len(CJK_PATTERN.findall(text))
+    words = len(WORD_PATTERN.findall(text))
+    rest = len(re.sub(r"[\sA-Za-z0-9\u3400-\u9fff\uf900-\ufaff]", "", text))
+    return cjk + (words * 4 + 2) // 3 + rest
+
+
+def condense(text: str, budget: int, title: str = "") -> str:
+    """
+    Extractive condensing: keep the most informative sentences of text, in
+    their original order, within a token budget. Sentences are scored by
+    lead position, figures and overlap with the title.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = [s.strip() for s in SENTENCE_PATTERN.findall(text) if s.strip()]
+    title_terms = {title[i:i + 2] for i in range(len(title) - 1)} | set(WORD_PATTERN.findall(title.lower()))
+
+    def score(index: int, sentence: str) -> float:
+        terms = {sentence[i:i + 2] for i in range(len(sentence) - 1)} | set(WORD_PATTERN.findall(sentence.lower()))
+        overlap = len(terms & title_terms) / (len(title_terms) or 1)
+        figures = len(re.findall(r"\d+(?:\.\d+)?%?", sentence))
+        lead = 1.0 / (1 + index)
+        return 2 * lead + overlap + 0.3 * min(figures, 5)
+
+    ranked = sorted(range(len(sentences)), key=lambda i: score(i, sentences[i]), reverse=True)
+    selected = set()
+    used = 0
+    for i in ranked:
+        cost = estimate_tokens(sentences[i])
+        if used + cost > budget:
+            continue
+        selected.add(i)
+        used += cost
+    return "\n".join(sentences[i] for i in sorted(selected))
+
+
+def configure_gemini(genai):
+    """
+    Configures the Gemini SDK. GEMINI_API_ENDPOINT points it at another
+    endpoint over REST, e.g. the stand-in server of bench_pipeline.
+    """
+    endpoint = getattr(settings, "GEMINI_API_ENDPOINT", "")
+    if endpoint:
+        genai.configure(api_key=settings.GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+
+
 def gemini_gen(model, prompt: str, stream: bool=True) -> str:
-    response = model.generate_content(prompt, stream=stream)
-    return get_gemini_stream_response(response)
+    call = metrics.llm_call("gemini")
+    try:
+        response = model.generate_content(prompt, stream=stream)
+        ret_str = get_gemini_stream_response(response, call)
+    except Exception:
+        call.failed()
+        raise
+    if call.enabled:
+        # Available once the stream is consumed
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            call.usage(prompt=usage.prompt_token_count, completion=usage.candidates_token_count,
+                       cached=getattr(usage, "cached_content_token_count", 0))
+        call.done(prompt, ret_str)
+    return ret_str
 
 
-def get_gemini_stream_response(stream: Iterator,):
+def get_gemini_stream_response(stream: Iterator, call=metrics.NULL_CALL):
     full_text = []
     
     for chunk in stream:
         if chunk.candidates:
             if chunk.candidates[0].content.parts:
+                call.first_token()
                 try:
                     text_part = chunk.text
                     full_text.append(text_part)
@@ -30,32 +134,47 @@ def get_gemini_stream_response(stream: Iterator,):
     return ret_str
 
 
-def groq_gen(client, model, prompt: str, stream: bool=True) -> str:
+def groq_gen(client, model, prompt: str, stream: bool=True, system: str = "", json_mode: bool = False) -> str:
     logger.debug(f"prompt: {prompt}")
     logger.debug(f"model: {model}")
-    stream = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": prompt,
-            }
-        ],
-        model=model,
-        stream=stream,
-    )
-    return get_groq_stream_response(stream)
-
-
-def get_groq_stream_response(stream: Iterator):
+    messages = []
+    if system:
+        # A stable system message first lets Groq reuse its cached prefix
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    call = metrics.llm_call("groq")
+    try:
+        stream = client.chat.completions.create(
+            messages=messages,
+            model=model,
+            stream=stream,
+            **extra,
+        )
+        ret_str = get_groq_stream_response(stream, call)
+    except Exception:
+        call.failed()
+        raise
+    call.done(system + prompt, ret_str)
+    return ret_str
+
+
+def get_groq_stream_response(stream: Iterator, call=metrics.NULL_CALL):
     full_text = []
     
     for chunk in stream:
+        content = ""
         if chunk.choices and chunk.choices[0].delta.content is not None:
             content = chunk.choices[0].delta.content
-        else:
-            ""
         if content:
+            call.first_token()
             full_text.append(content) 
+        # Groq reports the usage of a stream in its last chunk
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+        if usage:
+            details = getattr(usage, "prompt_tokens_details", None)
+            call.usage(prompt=usage.prompt_tokens, completion=usage.completion_tokens,
+                       cached=getattr(details, "cached_tokens", None) or 0)
     ret_str = "".join(full_text)
     logger.debug(f"Groq response: {ret_str}")
     return ret_str
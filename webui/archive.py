@@ -0,0 +1,81 @@
+import zlib
+from django.db import transaction
+from django.utils import timezone
+from .models import ArchivedContent, NewsArticles
+
+# Article bodies older than ARCHIVE_CONTENT_AFTER_DAYS are moved into the
+# compressed news_archived_content table by the archive_content command.
+# news_articles then keeps an empty original_content and a NULL
+# translated_content, and restore_content() puts the bodies back on the
+# instance when a page needs them. On Postgres the search_vector trigger
+# keeps the body terms of archived rows (migration 0012), elsewhere the
+# admin search falls back to search_archived().
+COMPRESSION_LEVEL = 9
+
+
+def compress(text: str):
+    return None if text is None else zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress(data):
+    return None if data is None else zlib.decompress(bytes(data)).decode('utf-8')
+
+
+def is_archived(article) -> bool:
+    return getattr(article, 'archived_content', None) is not None
+
+
+def restore_content(article):
+    """
+    Loads archived bodies into the instance in memory, without touching the
+    database row. Does nothing for articles that are not archived.
+    """
+    archived = getattr(article, 'archived_content', None)
+    if archived is not None:
+        article.original_content = decompress(archived.original_content)
+        article.translated_content = decompress(archived.translated_content)
+    return article
+
+
+def archive_articles(articles: list) -> int:
+    """
+    Moves the bodies of articles into the archive table. Returns the number
+    of uncompressed bytes moved.
+    """
+    now = timezone.now()
+    rows = []
+    moved = 0
+    for article in articles:
+        size = len((article.original_content or '').encode('utf-8')) + len((article.translated_content or '').encode('utf-8'))
+        rows.append(ArchivedContent(
+            article_id=article.id,
+            original_content=compress(article.original_content or ''),
+            translated_content=compress(article.translated_content),
+            original_size=size,
+            archived_at=now,
+        ))
+        moved += size
+    with transaction.atomic():
+        ArchivedContent.objects.bulk_create(rows, update_conflicts=True, unique_fields=['article'],
+                                            update_fields=['original_content', 'translated_content',
+                                                           'original_size', 'archived_at'])
+        NewsArticles.objects.filter(id__in=[a.id for a in articles]).update(original_content='', translated_content=None)
+    return moved
+
+
+def search_archived(term: str) -> list[int]:
+    """
+    Ids of archived articles whose text contains every word of term, for the
+    admin search fallback without full-text search, where the compressed
+    bodies cannot be matched in SQL. Inflates the whole archive, so it is
+    only meant for small development databases.
+    """
+    words = term.lower().split()
+    ids = []
+    rows = ArchivedContent.objects.values_list('article_id', 'article__cn_title', 'article__result',
+                                               'original_content', 'translated_content')
+    for article_id, cn_title, result, original, translated in rows.iterator(chunk_size=200):
+        text = "\n".join([cn_title or '', result or '', decompress(original) or '', decompress(translated) or '']).lower()
+        if words and all(word in text for word in words):
+            ids.append(article_id)
+    return ids
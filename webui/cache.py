@@ -0,0 +1,68 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from .models import CacheGeneration
+
+# Cached article reads are keyed by a generation counter. Anything that adds
+# or changes articles calls bump_generation(), which makes every older key
+# unreachable, so reads never serve stale data and nothing has to be deleted.
+# The counter is a row in cache_generations, incremented with a single
+# UPDATE, so concurrent bumps are never lost and crawler workers on other
+# hosts invalidate the reads of every web worker. The cached values
+# themselves may live in a per-host backend. Callers that pass the request
+# read the row once per request, not once per cached read.
+GENERATION = "articles"
+
+
+def current() -> CacheGeneration:
+    row = CacheGeneration.objects.filter(name=GENERATION).first()
+    if row is None:
+        # Start from the clock, so a recreated row never reuses an old generation
+        row, _ = CacheGeneration.objects.get_or_create(
+            name=GENERATION, defaults={'value': int(time.time() * 1000), 'modified_at': timezone.now()})
+    return row
+
+
+def current_for(request=None) -> CacheGeneration:
+    """current(), remembered on the request when there is one."""
+    if request is None:
+        return current()
+    if not hasattr(request, '_cache_generation'):
+        request._cache_generation = current()
+    return request._cache_generation
+
+
+def generation(request=None) -> int:
+    return current_for(request).value
+
+
+def bump_generation(request=None):
+    updated = (CacheGeneration.objects.filter(name=GENERATION)
+               .update(value=F('value') + 1, modified_at=timezone.now()))
+    if not updated:
+        current()
+    if request is not None and hasattr(request, '_cache_generation'):
+        # Reads later in the same request must not use the old generation
+        del request._cache_generation
+
+
+def last_modified(request=None):
+    return current_for(request).modified_at
+
+
+def cached_read(name: str, key: str, compute, timeout: int = None, request=None):
+    """
+    Returns the cached result of compute() for (name, key) in the current
+    generation, computing and storing it on a miss. None is never cached.
+    """
+    digest = hashlib.sha1(str(key).encode()).hexdigest()
+    cache_key = f"articles:{generation(request)}:{name}:{digest}"
+    value = cache.get(cache_key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(cache_key, value, timeout or getattr(settings, "READ_CACHE_TIMEOUT", 600))
+    return value
@@ -0,0 +1,28 @@
+from django.db import connections
+
+
+def pool_stats(alias: str = 'default') -> dict:
+    """
+    Wait time and utilization of the connection pool of a database, empty
+    when the database is not pooled.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, 'pool', None) if connection.vendor == 'postgresql' else None
+    if pool is None:
+        return {}
+    stats = pool.get_stats()
+    requests = stats.get('requests_num', 0)
+    in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+    return {
+        'size': stats.get('pool_size', 0),
+        'max_size': pool.max_size,
+        'in_use': in_use,
+        'utilization': in_use / pool.max_size if pool.max_size else 0.0,
+        'requests': requests,
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests_queued': stats.get('requests_queued', 0),
+        'requests_errors': stats.get('requests_errors', 0),
+        'wait_ms_total': stats.get('requests_wait_ms', 0),
+        'wait_ms_avg': stats.get('requests_wait_ms', 0) / requests if requests else 0.0,
+        'connections_errors': stats.get('connections_errors', 0),
+    }
@@ -0,0 +1,14 @@
+from django.contrib.admin import AllValuesFieldListFilter
+from .cache import cached_read
+
+
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """
+    AllValuesFieldListFilter whose distinct values are cached, so the
+    changelist does not run a SELECT DISTINCT over the table on every page.
+    """
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        choices = self.lookup_choices
+        self.lookup_choices = cached_read("filter", f"{model._meta.label_lower}:{field_path}", lambda: list(choices),
+                                          request=request)
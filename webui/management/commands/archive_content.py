@@ -0,0 +1,60 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q, Sum
+from django.utils import timezone
+from webui.archive import archive_articles
+from webui.models import ArchivedContent, NewsArticles
+
+# 30 3 * * * /path/to/yourprojectenv/bin/python /path/to/yourproject/manage.py archive_content
+
+
+class Command(BaseCommand):
+    help = 'Moves old article bodies into compressed cold storage and reports on the archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'ARCHIVE_CONTENT_AFTER_DAYS', 30),
+                            help='Archive articles created more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Articles archived per transaction.')
+        parser.add_argument('--limit', type=int, help='Stop after this many articles.')
+        parser.add_argument('--report', action='store_true', help='Only report, do not archive anything.')
+
+    def candidates(self, days: int):
+        cutoff = timezone.now() - timedelta(days=days)
+        return (NewsArticles.objects.filter(archived_content__isnull=True)
+                .filter(Q(created_at__lt=cutoff) | Q(created_at__isnull=True, publish_date__lt=cutoff))
+                .exclude(original_content='', translated_content__isnull=True))
+
+    def report(self, days: int):
+        pending = self.candidates(days).count()
+        stats = ArchivedContent.objects.aggregate(original=Sum('original_size'))
+        archived = ArchivedContent.objects.count()
+        self.stdout.write(f'Articles waiting to be archived (older than {days} days): {pending}')
+        self.stdout.write(f'Archived articles: {archived}, {(stats["original"] or 0) / 2**20:.1f} MB uncompressed')
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for table in ('news_articles', 'news_archived_content'):
+                    cursor.execute("SELECT pg_size_pretty(pg_total_relation_size(%s))", [table])
+                    self.stdout.write(f'{table}: {cursor.fetchone()[0]} on disk')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if options['report']:
+            self.report(days)
+            return
+        qs = self.candidates(days).only('id', 'original_content', 'translated_content').order_by('id')
+        total = 0
+        moved = 0
+        last_id = 0
+        while options['limit'] is None or total < options['limit']:
+            size = options['batch_size'] if options['limit'] is None else min(options['batch_size'], options['limit'] - total)
+            batch = list(qs.filter(id__gt=last_id)[:size])
+            if not batch:
+                break
+            moved += archive_articles(batch)
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Archived {total} articles, {moved / 2**20:.1f} MB moved')
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} articles.'))
+        self.report(days)
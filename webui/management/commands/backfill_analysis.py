@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from webui.agent.analysis import parse_markdown, save_analysis
+from webui.cache import bump_generation
+from webui.models import NewsArticles
+
+
+class Command(BaseCommand):
+    help = 'Parses the text analysis of existing articles into the structured analysis tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        qs = (NewsArticles.objects.filter(analysis__isnull=True).exclude(result='')
+              .only('id', 'result').order_by('id'))
+        total = 0
+        for article in qs.iterator(chunk_size=options['batch_size']):
+            save_analysis(article, parse_markdown(article.result))
+            total += 1
+        if total:
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {total} analyses.'))
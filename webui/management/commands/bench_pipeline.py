@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import resource
+import tempfile
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from webui.agent import metrics
+from webui.agent.bench import FakeConfig, FakeServer, Fixtures, record_fixtures
+
+# Offline end-to-end benchmark, no network or API keys needed:
+# python manage.py bench_pipeline --workers 1,2,4,8 --articles 40 --provider groq
+# DB_ENGINE=sqlite python manage.py bench_pipeline --output bench.json
+# python manage.py bench_pipeline --baseline bench.json --tolerance 15
+
+STAGES = ['article', 'extract', 'translate', 'analyze', 'save']
+RESULT_PREFIX = 'BENCH_RESULT '
+
+
+class Command(BaseCommand):
+    help = ('Runs the crawler pipeline against a local feed and fake LLM endpoints and reports '
+            'throughput, per-stage latency and peak memory for each worker count.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,2,4,8', help='Comma separated worker counts to compare.')
+        parser.add_argument('--articles', type=int, default=40, help='Generated articles in the feed.')
+        parser.add_argument('--fixtures', help='Directory with feed.xml and articles/*.html instead of generated ones.')
+        parser.add_argument('--save-fixtures', help='Write the generated fixtures to this directory and exit.')
+        parser.add_argument('--record', help='Record the live Yahoo feed and pages into this directory and exit.')
+        parser.add_argument('--provider', choices=['groq', 'gemini', 'ollama'], default='groq',
+                            help='Provider SDK used for translation and analysis, against its fake endpoint.')
+        parser.add_argument('--ttft-ms', type=int, default=300, help='Fake LLM time to first token.')
+        parser.add_argument('--chunk-ms', type=int, default=20, help='Fake LLM delay between streamed chunks.')
+        parser.add_argument('--chunk-tokens', type=int, default=8, help='Characters per streamed chunk.')
+        parser.add_argument('--max-tokens', type=int, default=1500, help='Upper bound of fake translation length.')
+        parser.add_argument('--page-ms', type=int, default=50, help='Delay before serving an article page.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of LLM requests answered with an error.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for fixtures and error injection.')
+        parser.add_argument('--browser', action='store_true', help='Load pages with Playwright like production.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against.')
+        parser.add_argument('--tolerance', type=float, default=10.0,
+                            help='Percent of throughput loss or p95 growth against the baseline that fails the run.')
+        # Internal: one measured run in a fresh process, driven by the parent
+        parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+        parser.add_argument('--server', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['record']:
+            record_fixtures(options['record'], options['articles'])
+            self.stdout.write(self.style.SUCCESS(f'Recorded fixtures into {options["record"]}'))
+            return
+        if options['save_fixtures']:
+            Fixtures.generate(options['articles'], options['seed']).save(options['save_fixtures'])
+            self.stdout.write(self.style.SUCCESS(f'Wrote fixtures into {options["save_fixtures"]}'))
+            return
+        if options['run_one'] is not None:
+            result = self.run_one(options['run_one'], options['server'], options)
+            self.stdout.write(RESULT_PREFIX + json.dumps(result))
+            return
+
+        try:
+            counts = [int(w) for w in options['workers'].split(',') if w.strip()]
+        except ValueError:
+            raise CommandError(f'Invalid worker counts: {options["workers"]}')
+        fixtures = (Fixtures.load(options['fixtures']) if options['fixtures']
+                    else Fixtures.generate(options['articles'], options['seed']))
+        config = FakeConfig(ttft_ms=options['ttft_ms'], chunk_ms=options['chunk_ms'],
+                            chunk_tokens=options['chunk_tokens'], page_ms=options['page_ms'],
+                            error_rate=options['error_rate'], max_tokens=options['max_tokens'], seed=options['seed'])
+        server = FakeServer(fixtures, config).start()
+        self.stdout.write(f'Serving {len(fixtures.pages)} articles and fake {options["provider"]} at {server.url}')
+        results = []
+        try:
+            for workers in counts:
+                self.stdout.write(f'Running with {workers} workers...')
+                results.append(self.spawn(workers, server.url, options))
+        finally:
+            server.shutdown()
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'options': {k: options[k] for k in ('articles', 'provider', 'ttft_ms', 'chunk_ms',
+                                                               'chunk_tokens', 'page_ms', 'error_rate')},
+                           'database': connection.vendor, 'results': results}, f, indent=2)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def spawn(self, workers: int, server: str, options) -> dict:
+        """Runs one measurement in a child process, so peak RSS is per worker count."""
+        args = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_pipeline',
+                '--run-one', str(workers), '--server', server, '--provider', options['provider']]
+        if options['browser']:
+            args.append('--browser')
+        proc = subprocess.run(args, stdout=subprocess.PIPE, text=True, env=os.environ.copy())
+        lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if proc.returncode or not lines:
+            raise CommandError(f'Benchmark run with {workers} workers failed (exit code {proc.returncode})')
+        return json.loads(lines[-1][len(RESULT_PREFIX):])
+
+    def run_one(self, workers: int, server: str, options) -> dict:
+        from webui.agent.run import Pipeline
+        provider = options['provider']
+        # The Groq SDK reads its endpoint from the environment
+        os.environ['GROQ_BASE_URL'] = server
+        overrides = {
+            'RSS_SCRAPER': 'bench',
+            'RSS_SCRAPER_REGISTRY': {'bench': 'webui.agent.bench.BenchScraper'},
+            'BENCH_SERVER_URL': server,
+            'BENCH_BROWSER': options['browser'],
+            'TRANSLATOR': provider,
+            'ANALYZER': provider,
+            'OLLAMA_URL': f'{server}/api/generate',
+            'GEMINI_API_ENDPOINT': server,
+            'GROQ_API_KEY': 'bench',
+            'GEMINI_API_KEY': 'bench',
+            'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            'METRICS_DIR': tempfile.mkdtemp(prefix='fna_bench_'),
+            # Measure the full path even for fixtures older than the deadline
+            'CRAWL_STALE_ACTION': 'process',
+        }
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**overrides):
+                metrics.enable()
+                metrics.REGISTRY.reset()
+                pipeline = Pipeline(workers=workers)
+                start = time.perf_counter()
+                pipeline.run()
+                elapsed = time.perf_counter() - start
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(overrides['METRICS_DIR'], ignore_errors=True)
+        registry = metrics.REGISTRY
+        stages = {}
+        for (name, labels), h in registry.histograms.items():
+            if name in ('fna_stage_seconds', 'fna_llm_ttft_seconds'):
+                key = dict(labels).get('stage') or f'ttft_{dict(labels).get("provider")}'
+                stages[key] = {'count': h.count, 'p50': h.quantile(0.5), 'p95': h.quantile(0.95)}
+        articles = registry.counter('fna_articles_total')
+        return {
+            'workers': workers,
+            'articles': articles,
+            'saved': registry.counter('fna_articles_total', outcome='saved'),
+            'failed': registry.counter('fna_articles_total', outcome='failed'),
+            'seconds': elapsed,
+            'articles_per_sec': articles / elapsed if elapsed else 0.0,
+            'stages': stages,
+            # Kilobytes on Linux
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'llm_errors': registry.counter('fna_llm_errors_total'),
+        }
+
+    def report(self, results: list):
+        header = f'{"workers":>7} {"art/s":>7} {"saved":>5} {"failed":>6} {"rss MB":>7}'
+        header += ''.join(f' {s + " p50/p95":>20}' for s in STAGES)
+        self.stdout.write(header)
+        for r in results:
+            line = (f'{r["workers"]:>7} {r["articles_per_sec"]:>7.2f} {r["saved"]:>5g} {r["failed"]:>6g} '
+                    f'{r["peak_rss_mb"]:>7.1f}')
+            for s in STAGES:
+                stage = r['stages'].get(s)
+                cell = f'{stage["p50"]:.3f}/{stage["p95"]:.3f}' if stage else '-'
+                line += f' {cell:>20}'
+            self.stdout.write(line)
+
+    def compare(self, results: list, path: str, tolerance: float):
+        with open(path) as f:
+            baseline = {r['workers']: r for r in json.load(f)['results']}
+        regressions = []
+        for r in results:
+            base = baseline.get(r['workers'])
+            if not base:
+                continue
+            if base['articles_per_sec'] and r['articles_per_sec'] < base['articles_per_sec'] * (1 - tolerance / 100):
+                regressions.append(f'{r["workers"]} workers: {r["articles_per_sec"]:.2f} articles/s, '
+                                   f'baseline {base["articles_per_sec"]:.2f}')
+            for s in STAGES:
+                now, then = r['stages'].get(s), base['stages'].get(s)
+                if now and then and then['p95'] and now['p95'] > then['p95'] * (1 + tolerance / 100):
+                    regressions.append(f'{r["workers"]} workers: {s} p95 {now["p95"]:.3f}s, baseline {then["p95"]:.3f}s')
+        if regressions:
+            raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regression beyond {tolerance:g}% against {path}'))
@@ -0,0 +1,95 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from webui.search import build_tsquery
+
+# python manage.py bench_search --rows 1000000
+
+TABLE = 'bench_news_articles'
+
+EN_WORDS = [
+    "stocks", "market", "earnings", "revenue", "fed", "rate", "inflation", "oil", "bank", "chip",
+    "tariff", "investors", "growth", "shares", "profit", "guidance", "energy", "travel", "health",
+    "nvidia", "apple", "tesla", "treasury", "yield", "dollar", "china", "europe", "jobs", "consumer",
+    "the", "a", "of", "and", "to", "in", "on", "for", "with", "after", "said", "will", "quarter",
+]
+CN_WORDS = [
+    "美联储", "降息", "通胀", "股市", "科技股", "银行", "能源", "原油", "关税", "投资者", "财报",
+    "营收", "利润", "芯片", "航空", "医疗", "美元", "国债", "收益率", "市场", "上涨", "下跌",
+    "预期", "经济", "增长", "风险", "建议", "影响", "正面", "负面", "中性", "关注", "观望",
+]
+
+QUERIES = ["earnings", "oil tariff", "美联储", "降息 通胀", "nvidia 芯片"]
+
+
+def random_text(words: list[str], count: int, sep: str) -> str:
+    """SQL expression for count random words, re-evaluated for each row g."""
+    array = "ARRAY[" + ",".join(f"'{w}'" for w in words) + "]"
+    return (f"(SELECT string_agg(({array})[1 + floor(random() * {len(words)})::int], '{sep}') "
+            f"FROM generate_series(1, {count}) WHERE g > 0)")
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks ILIKE search against the search_vector GIN index on a synthetic table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Rows in the synthetic table.')
+        parser.add_argument('--words', type=int, default=300, help='Words per article body.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per query, the best one is reported.')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic table for another run.')
+
+    def timed(self, cursor, sql, params, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000, len(rows)
+
+    def build(self, cursor, rows, words):
+        cursor.execute(f"SELECT to_regclass('{TABLE}')")
+        if cursor.fetchone()[0]:
+            cursor.execute(f"SELECT count(*) FROM {TABLE}")
+            if cursor.fetchone()[0] >= rows:
+                self.stdout.write(f'Reusing {TABLE}')
+                return
+            cursor.execute(f"DROP TABLE {TABLE}")
+        self.stdout.write(f'Building {TABLE} with {rows} rows...')
+        start = time.perf_counter()
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE news_articles INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING GENERATED)")
+        cursor.execute(f"""
+            INSERT INTO {TABLE} (title, cn_title, original_content, source_url, source_name, author,
+                                 publish_date, result, translated_content)
+            SELECT {random_text(EN_WORDS, 10, ' ')}, {random_text(CN_WORDS, 8, '')},
+                   {random_text(EN_WORDS, words, ' ')}, 'https://example.com/news/' || g, 'bench', 'bench',
+                   now() - g * interval '1 minute', {random_text(CN_WORDS, words // 3, '')},
+                   {random_text(CN_WORDS, words, '')}
+            FROM generate_series(1, {rows}) AS g
+        """)
+        cursor.execute(f"CREATE INDEX {TABLE}_search_idx ON {TABLE} USING GIN (search_vector)")
+        cursor.execute(f"ANALYZE {TABLE}")
+        self.stdout.write(f'Built in {time.perf_counter() - start:.1f} s')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The search benchmark needs PostgreSQL.')
+        with connection.cursor() as cursor:
+            self.build(cursor, options['rows'], options['words'])
+            self.stdout.write(f'{"query":<16} {"ILIKE ms":>10} {"rows":>6} {"tsvector ms":>12} {"rows":>6}')
+            for term in QUERIES:
+                # Same shape as the admin's search_fields lookup: every word in any column
+                bits = term.split()
+                where = " AND ".join(["(cn_title ILIKE %s OR original_content ILIKE %s "
+                                      "OR translated_content ILIKE %s OR result ILIKE %s)"] * len(bits))
+                like = f"SELECT id FROM {TABLE} WHERE {where} ORDER BY id DESC LIMIT 100"
+                like_params = [f'%{bit}%' for bit in bits for _ in range(4)]
+                like_ms, like_rows = self.timed(cursor, like, like_params, options['repeat'])
+                query, params = build_tsquery(term)
+                fts = (f"SELECT id FROM {TABLE} WHERE search_vector @@ ({query}) "
+                       f"ORDER BY ts_rank(search_vector, {query}) DESC, id DESC LIMIT 100")
+                fts_ms, fts_rows = self.timed(cursor, fts, params * 2, options['repeat'])
+                self.stdout.write(f'{term:<16} {like_ms:>10.1f} {like_rows:>6} {fts_ms:>12.1f} {fts_rows:>6}')
+            if not options['keep']:
+                cursor.execute(f"DROP TABLE {TABLE}")
@@ -3,6 +3,9 @@ from webui.agent.run import Pipeline
 # Import any other necessary modules (e.g., requests, csv, datetime)
 
 # 0 2 * * * /path/to/yourprojectenv/bin/python /path/to/yourproject/manage.py crawler >> /path/to/yourproject/logs/cron.log 2>&1
+# Distributed: one scheduler and any number of workers on any hosts
+# */30 * * * * /path/to/yourprojectenv/bin/python /path/to/yourproject/manage.py crawler --mode enqueue
+# /path/to/yourprojectenv/bin/python /path/to/yourproject/manage.py crawler --mode work --workers 4
 
 class Command(BaseCommand):
     help = 'Populates the NewsArticles with data from a source.'
@@ -11,21 +14,48 @@ class Command(BaseCommand):
         parser.add_argument(
             '--workers',
             type=int,
-            help='Optional: Sync data for a specific user ID.',
+            help='Number of worker threads in this process.',
             default=1,
         )
-
-    # You can add arguments if your command needs them
-    # def add_arguments(self, parser):
-    #     parser.add_argument('source_file', type=str, help='Path to the data source file')
+        parser.add_argument(
+            '--mode',
+            choices=['local', 'enqueue', 'work'],
+            default='local',
+            help='local: scrape and process the feed in this process. '
+                 'enqueue: add the feed items to the crawl job queue. '
+                 'work: process jobs from the queue.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='With --mode work, exit when the queue is empty instead of polling.',
+        )
+        parser.add_argument(
+            '--metrics',
+            action='store_true',
+            help='Record stage timings and token counts even if METRICS_ENABLED is off.',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting data population...'))
         workers = options['workers']
+        mode = options['mode']
+
+        if options['metrics']:
+            from webui.agent import metrics
+            metrics.enable()
 
         try:
             p = Pipeline(workers=workers)
-            p.run()
+            if mode == 'enqueue':
+                from webui.agent.queue import enqueue
+                self.stdout.write(f'Enqueued {enqueue(p)} new feed items.')
+            elif mode == 'work':
+                from webui.agent.queue import QueueWorker
+                processed = QueueWorker(p, threads=workers, once=options['once']).run()
+                self.stdout.write(f'Processed {processed} jobs.')
+            else:
+                p.run()
             self.stdout.write(self.style.SUCCESS('Data population finished successfully.'))
         except Exception as e:
             # It's good practice to catch specific exceptions
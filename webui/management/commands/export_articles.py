@@ -0,0 +1,169 @@
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.utils.dateparse import parse_datetime
+from webui.archive import decompress
+from webui.models import NewsArticles
+
+# python manage.py export_articles --format parquet --output /data/fna --state /data/fna/state.json
+
+FIELDS = [f.name for f in NewsArticles._meta.concrete_fields]
+
+
+def arrow_type(field):
+    import pyarrow as pa
+    if isinstance(field, (models.AutoField, models.BigAutoField, models.BigIntegerField, models.IntegerField)):
+        return pa.int64()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    return pa.string()
+
+
+class JsonlWriter:
+    suffix = '.jsonl'
+
+    def __init__(self, path: Path, fields: list[str], compression: str):
+        self.fields = fields
+        self.file = gzip.open(path, 'wt', encoding='utf-8') if compression == 'gzip' else open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: list[tuple]):
+        for row in rows:
+            record = {f: v.isoformat() if isinstance(v, datetime) else v for f, v in zip(self.fields, row)}
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    suffix = '.parquet'
+
+    def __init__(self, path: Path, fields: list[str], compression: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([(f, arrow_type(NewsArticles._meta.get_field(f))) for f in fields])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, rows: list[tuple]):
+        # One row group per chunk keeps memory flat
+        columns = list(zip(*rows))
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(col, type=self.schema.field(i).type) for i, col in enumerate(columns)],
+            schema=self.schema,
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'jsonl': JsonlWriter, 'parquet': ParquetWriter}
+DEFAULT_COMPRESSION = {'jsonl': 'gzip', 'parquet': 'zstd'}
+
+
+class Command(BaseCommand):
+    help = 'Streams NewsArticles to compressed, chunked JSONL or Parquet files in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=WRITERS, default='jsonl', help='Output format.')
+        parser.add_argument('--output', required=True, help='Output directory.')
+        parser.add_argument('--fields', default='', help=f'Comma separated columns, default all: {",".join(FIELDS)}')
+        parser.add_argument('--since-id', type=int, help='Only export articles with a larger id.')
+        parser.add_argument('--since', help='Only export articles created after this ISO datetime.')
+        parser.add_argument('--state', help='JSON watermark file, read before and updated after the export.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per server-side cursor round trip.')
+        parser.add_argument('--rows-per-file', type=int, default=100000, help='Rows per output file.')
+        parser.add_argument('--compression', help='gzip or none for jsonl; zstd, snappy, gzip or none for parquet.')
+
+    def parse_fields(self, value: str) -> list[str]:
+        fields = [f.strip() for f in value.split(',') if f.strip()] or FIELDS
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise CommandError(f'Unknown fields: {", ".join(unknown)}')
+        # The id is the watermark, so it is always exported
+        return fields if 'id' in fields else ['id'] + fields
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        if fmt == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError('Parquet export needs pyarrow: pip install pyarrow')
+        fields = self.parse_fields(options['fields'])
+        compression = options['compression'] or DEFAULT_COMPRESSION[fmt]
+        if fmt == 'jsonl' and compression not in ('gzip', 'none'):
+            raise CommandError('JSONL supports gzip or none compression.')
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+
+        state_path = Path(options['state']) if options['state'] else None
+        state = json.loads(state_path.read_text()) if state_path and state_path.exists() else {}
+        since_id = options['since_id'] if options['since_id'] is not None else state.get('id')
+
+        qs = NewsArticles.objects.all()
+        if since_id is not None:
+            qs = qs.filter(id__gt=since_id)
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f'Invalid datetime: {options["since"]}')
+            qs = qs.filter(created_at__gt=since)
+        # Bodies moved to cold storage come back through a join and are inflated
+        archived = [f for f in ('original_content', 'translated_content') if f in fields]
+        columns = fields + [f'archived_content__{f}' for f in archived]
+        rows = qs.order_by('id').values_list(*columns).iterator(chunk_size=options['chunk_size'])
+
+        writer_class = WRITERS[fmt]
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        id_index = fields.index('id')
+        writer = None
+        part = 0
+        in_file = 0
+        total = 0
+        last_id = since_id
+        batch = []
+
+        def flush():
+            nonlocal writer, part, in_file
+            if not batch:
+                return
+            if writer is None:
+                part += 1
+                suffix = writer_class.suffix + ('.gz' if fmt == 'jsonl' and compression == 'gzip' else '')
+                path = output / f'news_articles_{stamp}_{part:05d}{suffix}'
+                writer = writer_class(path, fields, None if compression == 'none' else compression)
+                self.stdout.write(f'Writing {path}')
+            writer.write(batch)
+            in_file += len(batch)
+            batch.clear()
+            if in_file >= options['rows_per_file']:
+                writer.close()
+                writer = None
+                in_file = 0
+
+        try:
+            for row in rows:
+                if archived:
+                    values = list(row[:len(fields)])
+                    for i, f in enumerate(archived):
+                        compressed = row[len(fields) + i]
+                        if compressed is not None:
+                            values[fields.index(f)] = decompress(compressed)
+                    row = tuple(values)
+                batch.append(row)
+                last_id = row[id_index]
+                total += 1
+                if len(batch) >= min(options['chunk_size'], options['rows_per_file'] - in_file):
+                    flush()
+            flush()
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if state_path and total:
+            state_path.write_text(json.dumps({'id': last_id, 'exported_at': datetime.now().isoformat()}))
+        self.stdout.write(self.style.SUCCESS(f'Exported {total} articles in {part} files, last id {last_id}.'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from webui.agent import simhash
+from webui.archive import decompress
+from webui.models import NewsArticles, NewsFingerprint
+
+
+class Command(BaseCommand):
+    help = 'Computes SimHash fingerprints for articles that do not have one yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows fetched and inserted per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Bodies moved to cold storage come back through a join and are inflated
+        rows = (NewsArticles.objects.filter(fingerprint__isnull=True).order_by('id')
+                .values_list('id', 'original_content', 'archived_content__original_content'))
+        batch = []
+        total = 0
+        for article_id, content, archived in rows.iterator(chunk_size=batch_size):
+            if archived is not None:
+                content = decompress(archived)
+            fingerprint = simhash.simhash(content or "")
+            b = simhash.bands(fingerprint)
+            batch.append(NewsFingerprint(
+                article_id=article_id, simhash=simhash.to_signed(fingerprint),
+                band0=b[0], band1=b[1], band2=b[2], band3=b[3],
+            ))
+            if len(batch) >= batch_size:
+                NewsFingerprint.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            NewsFingerprint.objects.bulk_create(batch)
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Fingerprinted {total} articles.'))
@@ -0,0 +1,67 @@
+import re
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# python manage.py importtime --crawler-budget 800 --wsgi-budget 600
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Each target is started in a fresh interpreter so nothing is already cached.
+TARGETS = {
+    "crawler": (
+        "import os, django; "
+        "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fna.settings'); "
+        "django.setup(); "
+        "from django.core.management import load_command_class; "
+        "load_command_class('webui', 'crawler')"
+    ),
+    "wsgi": "import fna.wsgi",
+}
+
+
+def measure(code: str) -> tuple[float, list[tuple[int, str]]]:
+    """
+    Run code under `python -X importtime` and return the total import time in
+    milliseconds plus the (cumulative_us, module) pairs of top-level imports.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    top_level = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m and len(m.group(3)) == 1:
+            top_level.append((int(m.group(2)), m.group(4)))
+    total_ms = sum(us for us, _ in top_level) / 1000
+    return total_ms, sorted(top_level, reverse=True)
+
+
+class Command(BaseCommand):
+    help = 'Measures startup import time of the crawler and the WSGI app against a budget.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--crawler-budget', type=float, default=1000, help='Budget in ms for the crawler command.')
+        parser.add_argument('--wsgi-budget', type=float, default=800, help='Budget in ms for the WSGI app.')
+        parser.add_argument('--runs', type=int, default=3, help='Runs per target, the best one is reported.')
+        parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to show.')
+
+    def handle(self, *args, **options):
+        budgets = {"crawler": options['crawler_budget'], "wsgi": options['wsgi_budget']}
+        over_budget = []
+        for name, code in TARGETS.items():
+            total_ms, top_level = min((measure(code) for _ in range(options['runs'])), key=lambda r: r[0])
+            style = self.style.SUCCESS if total_ms <= budgets[name] else self.style.ERROR
+            self.stdout.write(style(f'{name}: {total_ms:.1f} ms (budget {budgets[name]:.0f} ms)'))
+            for us, module in top_level[:options['top']]:
+                self.stdout.write(f'    {us / 1000:8.1f} ms  {module}')
+            if total_ms > budgets[name]:
+                over_budget.append(name)
+        if over_budget:
+            raise CommandError(f'Import time over budget: {", ".join(over_budget)}')
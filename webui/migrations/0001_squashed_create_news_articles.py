@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+# news_articles used to be created outside of Django, and 0002 onwards
+# reference it. This migration replaces 0001_initial: databases that already
+# applied 0001_initial treat it as applied and are left alone, while new
+# databases create the table here, before anything references it.
+
+
+def create_news_articles_table(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    if model._meta.db_table not in schema_editor.connection.introspection.table_names():
+        schema_editor.create_model(model)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    replaces = [
+        ('webui', '0001_initial'),
+    ]
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsArticles',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.TextField()),
+                ('cn_title', models.TextField()),
+                ('original_content', models.TextField()),
+                ('source_url', models.TextField()),
+                ('source_name', models.CharField(max_length=100)),
+                ('author', models.CharField(max_length=100)),
+                ('publish_date', models.DateTimeField()),
+                ('crawl_date', models.DateTimeField(blank=True, null=True)),
+                ('result', models.TextField()),
+                ('translated_content', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('translator', models.CharField(blank=True, max_length=50, null=True)),
+                ('analyzer', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+            options={
+                'db_table': 'news_articles',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_news_articles_table, migrations.RunPython.noop),
+    ]
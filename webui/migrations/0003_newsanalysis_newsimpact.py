@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0002_newsfingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.TextField()),
+                ('risk', models.TextField(blank=True, default='')),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis', to='webui.newsarticles')),
+            ],
+            options={
+                'db_table': 'news_analyses',
+            },
+        ),
+        migrations.CreateModel(
+            name='NewsImpact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('company', 'Company'), ('sector', 'Sector')], max_length=10)),
+                ('name', models.CharField(max_length=100)),
+                ('impact', models.CharField(choices=[('positive', 'Positive'), ('negative', 'Negative'), ('neutral', 'Neutral')], max_length=10)),
+                ('reason', models.TextField(blank=True, default='')),
+                ('advice', models.TextField(blank=True, default='')),
+                ('analysis', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impacts', to='webui.newsanalysis')),
+            ],
+            options={
+                'db_table': 'news_impacts',
+                'indexes': [models.Index(fields=['scope', 'name', 'impact'], name='news_impact_lookup_idx')],
+            },
+        ),
+    ]
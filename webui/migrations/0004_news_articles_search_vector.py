@@ -0,0 +1,84 @@
+from django.db import migrations
+
+# news_articles is not managed by Django, so the full-text column is added
+# with SQL. It is a stored generated column, so Postgres keeps it up to date
+# on every insert and update. Needs PostgreSQL 12+ and a UTF8 database.
+#
+# Cost on an existing table: adding a STORED generated column rewrites every
+# row while holding an ACCESS EXCLUSIVE lock, so news_articles is unreadable
+# and unwritable for the duration (roughly the time of a full table copy plus
+# the tsvector computation). Run it in a maintenance window on large tables.
+# The migration is not atomic, so the lock is released right after the
+# rewrite, and the GIN index is then built with CREATE INDEX CONCURRENTLY
+# without blocking the crawler or the admin.
+
+CREATE_BIGRAMS = r"""
+CREATE OR REPLACE FUNCTION fna_cjk_bigrams(doc text) RETURNS tsvector AS $$
+    SELECT array_to_tsvector(coalesce(array_agg(DISTINCT pair), '{}'))
+    FROM (
+        SELECT ch || lead(ch) OVER (ORDER BY n) AS pair
+        FROM unnest(string_to_array(coalesce(doc, ''), NULL)) WITH ORDINALITY AS t(ch, n)
+    ) pairs
+    WHERE pair ~ '^[\u4e00-\u9fff]{2}$'
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+"""
+
+ADD_COLUMN = """
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(fna_cjk_bigrams(cn_title), 'A') ||
+    setweight(fna_cjk_bigrams(result), 'B') ||
+    setweight(fna_cjk_bigrams(translated_content), 'C') ||
+    setweight(to_tsvector('english', coalesce(original_content, '')), 'D')
+) STORED;
+"""
+
+INDEX = 'news_articles_search_idx'
+CREATE_INDEX = f"CREATE INDEX CONCURRENTLY {INDEX} ON news_articles USING GIN (search_vector);"
+
+DROP = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX};",
+    "ALTER TABLE news_articles DROP COLUMN IF EXISTS search_vector;",
+    "DROP FUNCTION IF EXISTS fna_cjk_bigrams(text);",
+]
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_BIGRAMS)
+    schema_editor.execute(ADD_COLUMN)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+            [INDEX],
+        )
+        row = cursor.fetchone()
+    if row and row[0]:
+        return
+    if row:
+        # Left INVALID by an interrupted concurrent build
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX};")
+    schema_editor.execute(CREATE_INDEX)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('webui', '0003_newsanalysis_newsimpact'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,73 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# Brings news_articles under Django migrations and indexes the columns used by
+# the admin filters, ordering and Pipeline.is_dup.
+#
+# The migration is not atomic: on PostgreSQL each index is built with
+# CREATE INDEX CONCURRENTLY, so the live table keeps accepting reads and
+# writes. An index left INVALID by a failed concurrent build is dropped and
+# rebuilt when the migration is run again.
+
+INDEXES = [
+    django.contrib.postgres.indexes.HashIndex(fields=['source_url'], name='news_articles_url_hash'),
+    models.Index(fields=['source_name', 'publish_date'], name='news_articles_src_pub_idx'),
+    models.Index(fields=['publish_date'], name='news_articles_pub_idx'),
+    models.Index(fields=['author'], name='news_articles_author_idx'),
+]
+
+
+def add_indexes(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    connection = schema_editor.connection
+    for index in INDEXES:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+                    [index.name],
+                )
+                row = cursor.fetchone()
+            if row and row[0]:
+                continue
+            if row:
+                schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            # Hash indexes are PostgreSQL only, other backends get a B-tree
+            schema_editor.add_index(model, models.Index(fields=index.fields, name=index.name))
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for index in INDEXES:
+        if concurrently:
+            schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('webui', '0004_news_articles_search_vector'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterModelOptions(
+                    name='newsarticles',
+                    options={},
+                ),
+            ] + [
+                migrations.AddIndex(model_name='newsarticles', index=index) for index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+        ),
+    ]
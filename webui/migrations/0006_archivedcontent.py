@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_storage_external(apps, schema_editor):
+    # The bodies are already compressed, skip TOAST's own compression
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE news_archived_content "
+        "ALTER COLUMN original_content SET STORAGE EXTERNAL, "
+        "ALTER COLUMN translated_content SET STORAGE EXTERNAL"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0005_manage_news_articles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedContent',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archived_content', serialize=False, to='webui.newsarticles')),
+                ('original_content', models.BinaryField()),
+                ('translated_content', models.BinaryField(null=True)),
+                ('original_size', models.IntegerField()),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'news_archived_content',
+            },
+        ),
+        migrations.RunPython(set_storage_external, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0007_crawljob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crawljob',
+            name='priority',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='crawljob',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='crawljob',
+            index=models.Index(fields=['status', '-priority'], name='crawl_jobs_priority_idx'),
+        ),
+    ]
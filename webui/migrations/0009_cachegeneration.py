@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0008_crawljob_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheGeneration',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField()),
+                ('modified_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'cache_generations',
+            },
+        ),
+    ]
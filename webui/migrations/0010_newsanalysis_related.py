@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+# backfill_analysis used to store the legacy related stocks block as a
+# company named 相关股票. Move it to the new free text column.
+LEGACY_COMPANY = '相关股票'
+
+
+def move_legacy_companies(apps, schema_editor):
+    NewsAnalysis = apps.get_model('webui', 'NewsAnalysis')
+    NewsImpact = apps.get_model('webui', 'NewsImpact')
+    legacy = NewsImpact.objects.filter(scope='company', name=LEGACY_COMPANY)
+    for impact in legacy.iterator():
+        NewsAnalysis.objects.filter(id=impact.analysis_id).update(
+            related=f"* **影响：** {impact.reason}\n* **建议：** {impact.advice}")
+    legacy.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0009_cachegeneration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsanalysis',
+            name='related',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(move_legacy_companies, migrations.RunPython.noop),
+    ]
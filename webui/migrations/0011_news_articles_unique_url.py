@@ -0,0 +1,104 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+# Makes news_articles.source_url unique, so two queue workers that process
+# the same URL cannot both save it. Existing duplicates are removed first,
+# keeping the oldest row of each URL (its fingerprint, analysis and archived
+# content go with the deleted rows).
+#
+# The migration is not atomic: on PostgreSQL the unique index is built with
+# CREATE UNIQUE INDEX CONCURRENTLY and then attached as the constraint, which
+# only takes a brief lock. An index left INVALID by an interrupted build is
+# dropped and rebuilt when the migration is run again. The unique B-tree also
+# serves the source_url lookups of Pipeline.is_dup, so the hash index of 0005
+# is dropped, concurrently as well.
+
+CONSTRAINT = models.UniqueConstraint(fields=['source_url'], name='news_articles_source_url_uniq')
+HASH_INDEX = django.contrib.postgres.indexes.HashIndex(fields=['source_url'], name='news_articles_url_hash')
+
+
+def remove_duplicates(apps, schema_editor):
+    NewsArticles = apps.get_model('webui', 'NewsArticles')
+    dups = (NewsArticles.objects.values('source_url')
+            .annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1))
+    for dup in dups.iterator():
+        NewsArticles.objects.filter(source_url=dup['source_url']).exclude(id=dup['keep']).delete()
+
+
+def add_constraint(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        schema_editor.add_constraint(model, CONSTRAINT)
+        return
+    name = CONSTRAINT.name
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", [name])
+        if cursor.fetchone():
+            return
+        cursor.execute(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+            [name],
+        )
+        row = cursor.fetchone()
+    if row and not row[0]:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    if not row or not row[0]:
+        schema_editor.execute(f'CREATE UNIQUE INDEX CONCURRENTLY "{name}" ON news_articles (source_url)')
+    schema_editor.execute(f'ALTER TABLE news_articles ADD CONSTRAINT "{name}" UNIQUE USING INDEX "{name}"')
+
+
+def remove_constraint(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    schema_editor.remove_constraint(model, CONSTRAINT)
+
+
+def drop_hash_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{HASH_INDEX.name}"')
+    else:
+        # 0005 created a B-tree on other backends
+        model = apps.get_model('webui', 'NewsArticles')
+        schema_editor.remove_index(model, models.Index(fields=HASH_INDEX.fields, name=HASH_INDEX.name))
+
+
+def restore_hash_index(apps, schema_editor):
+    model = apps.get_model('webui', 'NewsArticles')
+    if schema_editor.connection.vendor == 'postgresql':
+        # Databases migrated before the drop was added to this migration still have it
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{HASH_INDEX.name}" '
+            f'ON "{model._meta.db_table}" USING hash ("source_url")'
+        )
+    else:
+        schema_editor.add_index(model, models.Index(fields=HASH_INDEX.fields, name=HASH_INDEX.name))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('webui', '0010_newsanalysis_related'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(model_name='newsarticles', constraint=CONSTRAINT),
+            ],
+            database_operations=[
+                migrations.RunPython(add_constraint, remove_constraint),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(model_name='newsarticles', name=HASH_INDEX.name),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_hash_index, restore_hash_index),
+            ],
+        ),
+    ]
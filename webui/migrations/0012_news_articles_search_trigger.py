@@ -0,0 +1,113 @@
+import zlib
+from django.db import migrations
+
+# news_articles.search_vector becomes a plain column maintained by a trigger.
+# As a generated column it was recomputed when archive_content blanked the
+# bodies, so archived articles lost their body terms. The trigger computes
+# the same vector as 0004, except when the bodies are moved to cold storage:
+# then the body terms (weights C and D) of the previous vector are kept.
+#
+# DROP EXPRESSION keeps the stored values and does not rewrite the table.
+# Rows archived before this migration get their body terms back from the
+# archive. Needs PostgreSQL 13+.
+
+CREATE_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION fna_news_articles_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(fna_cjk_bigrams(NEW.cn_title), 'A') ||
+        setweight(fna_cjk_bigrams(NEW.result), 'B');
+    IF TG_OP = 'UPDATE' AND NEW.original_content = '' AND NEW.translated_content IS NULL
+            AND EXISTS (SELECT 1 FROM news_archived_content WHERE article_id = NEW.id) THEN
+        -- The bodies moved to news_archived_content, keep their terms
+        NEW.search_vector := NEW.search_vector || ts_filter(coalesce(OLD.search_vector, ''), '{c,d}');
+    ELSE
+        NEW.search_vector := NEW.search_vector ||
+            setweight(fna_cjk_bigrams(NEW.translated_content), 'C') ||
+            setweight(to_tsvector('english', coalesce(NEW.original_content, '')), 'D');
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGER = """
+CREATE TRIGGER news_articles_search_vector
+BEFORE INSERT OR UPDATE OF title, cn_title, result, translated_content, original_content ON news_articles
+FOR EACH ROW EXECUTE FUNCTION fna_news_articles_search_vector();
+"""
+
+# Only search_vector is updated, which does not fire the trigger
+ADD_BODY_TERMS = """
+UPDATE news_articles SET search_vector = search_vector ||
+    setweight(fna_cjk_bigrams(%s), 'C') || setweight(to_tsvector('english', %s), 'D')
+WHERE id = %s
+"""
+
+DROP_TRIGGER = [
+    "DROP TRIGGER IF EXISTS news_articles_search_vector ON news_articles;",
+    "DROP FUNCTION IF EXISTS fna_news_articles_search_vector();",
+]
+
+# Back to the generated column of 0004, archived rows lose their body terms again
+RESTORE_GENERATED = [
+    "DROP INDEX CONCURRENTLY IF EXISTS news_articles_search_idx;",
+    "ALTER TABLE news_articles DROP COLUMN IF EXISTS search_vector;",
+    """
+    ALTER TABLE news_articles ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(fna_cjk_bigrams(cn_title), 'A') ||
+        setweight(fna_cjk_bigrams(result), 'B') ||
+        setweight(fna_cjk_bigrams(translated_content), 'C') ||
+        setweight(to_tsvector('english', coalesce(original_content, '')), 'D')
+    ) STORED;
+    """,
+    "CREATE INDEX CONCURRENTLY news_articles_search_idx ON news_articles USING GIN (search_vector);",
+]
+
+
+def decompress(data):
+    return None if data is None else zlib.decompress(bytes(data)).decode('utf-8')
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_TRIGGER:
+        schema_editor.execute(sql)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT attgenerated FROM pg_attribute "
+            "WHERE attrelid = 'news_articles'::regclass AND attname = 'search_vector'"
+        )
+        if cursor.fetchone()[0]:
+            cursor.execute("ALTER TABLE news_articles ALTER COLUMN search_vector DROP EXPRESSION")
+    schema_editor.execute(CREATE_FUNCTION)
+    schema_editor.execute(CREATE_TRIGGER)
+    ArchivedContent = apps.get_model('webui', 'ArchivedContent')
+    rows = ArchivedContent.objects.values_list('article_id', 'original_content', 'translated_content')
+    with schema_editor.connection.cursor() as cursor:
+        for article_id, original, translated in rows.iterator(chunk_size=200):
+            cursor.execute(ADD_BODY_TERMS, [decompress(translated), decompress(original) or '', article_id])
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_TRIGGER + RESTORE_GENERATED:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('webui', '0011_news_articles_unique_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
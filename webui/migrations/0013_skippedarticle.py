@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webui', '0012_news_articles_search_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkippedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.TextField(unique=True)),
+                ('reason', models.CharField(max_length=50)),
+                ('skipped_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'news_skipped',
+            },
+        ),
+    ]
@@ -24,5 +24,155 @@ class NewsArticles(models.Model):
     analyzer = models.CharField(blank=True, null=True, max_length=50)
 
     class Meta:
-        managed = False
         db_table = 'news_articles'
+        # Created CONCURRENTLY by migration 0005_manage_news_articles. Lookups
+        # by source_url use the unique index of the constraint below.
+        indexes = [
+            models.Index(fields=['source_name', 'publish_date'], name='news_articles_src_pub_idx'),
+            models.Index(fields=['publish_date'], name='news_articles_pub_idx'),
+            models.Index(fields=['author'], name='news_articles_author_idx'),
+        ]
+        # Added by migration 0011, so concurrent workers cannot save an article twice
+        constraints = [
+            models.UniqueConstraint(fields=['source_url'], name='news_articles_source_url_uniq'),
+        ]
+
+
+class NewsFingerprint(models.Model):
+    """
+    SimHash of the article content, banded for LSH lookup of near-duplicates.
+    """
+    article = models.OneToOneField(NewsArticles, on_delete=models.CASCADE, related_name='fingerprint')
+    simhash = models.BigIntegerField()
+    band0 = models.IntegerField(db_index=True)
+    band1 = models.IntegerField(db_index=True)
+    band2 = models.IntegerField(db_index=True)
+    band3 = models.IntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'news_fingerprints'
+
+
+class NewsAnalysis(models.Model):
+    """
+    Structured analysis of an article. NewsArticles.result is rendered from it.
+    """
+    article = models.OneToOneField(NewsArticles, on_delete=models.CASCADE, related_name='analysis')
+    summary = models.TextField()
+    risk = models.TextField(blank=True, default='')
+    # Free text related stocks block of backfilled markdown analyses,
+    # which name no company. Empty for structured output.
+    related = models.TextField(blank=True, default='')
+
+    class Meta:
+        db_table = 'news_analyses'
+
+    def to_dict(self) -> dict:
+        data = {"summary": self.summary, "risk": self.risk, "related": self.related, "companies": [], "sectors": {}}
+        for impact in self.impacts.all():
+            item = {"impact": impact.impact, "reason": impact.reason, "advice": impact.advice}
+            if impact.scope == NewsImpact.COMPANY:
+                data["companies"].append({"name": impact.name, **item})
+            else:
+                data["sectors"][impact.name] = item
+        return data
+
+
+class NewsImpact(models.Model):
+    """
+    Impact of an article on one company or one sector.
+    """
+    COMPANY = 'company'
+    SECTOR = 'sector'
+    SCOPE_CHOICES = [(COMPANY, 'Company'), (SECTOR, 'Sector')]
+    IMPACT_CHOICES = [('positive', 'Positive'), ('negative', 'Negative'), ('neutral', 'Neutral')]
+
+    analysis = models.ForeignKey(NewsAnalysis, on_delete=models.CASCADE, related_name='impacts')
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    name = models.CharField(max_length=100)
+    impact = models.CharField(max_length=10, choices=IMPACT_CHOICES)
+    reason = models.TextField(blank=True, default='')
+    advice = models.TextField(blank=True, default='')
+
+    class Meta:
+        db_table = 'news_impacts'
+        indexes = [
+            models.Index(fields=['scope', 'name', 'impact'], name='news_impact_lookup_idx'),
+        ]
+
+
+class ArchivedContent(models.Model):
+    """
+    zlib compressed article bodies moved out of news_articles by the
+    archive_content command. See webui.archive.
+    """
+    article = models.OneToOneField(NewsArticles, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='archived_content')
+    original_content = models.BinaryField()
+    translated_content = models.BinaryField(null=True)
+    original_size = models.IntegerField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'news_archived_content'
+
+
+class SkippedArticle(models.Model):
+    """
+    Feed item the pipeline decided not to analyze, with the reason.
+    Pipeline.is_dup checks it, so the item is not extracted and scored again
+    on every run. Delete rows to have their URLs considered again.
+    """
+    url = models.TextField(unique=True)
+    reason = models.CharField(max_length=50)
+    skipped_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'news_skipped'
+
+
+class CrawlJob(models.Model):
+    """
+    Article URL waiting to be processed by a distributed crawler worker.
+    See webui.agent.queue.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    url = models.TextField(unique=True)
+    title = models.TextField(blank=True, default='')
+    published = models.CharField(max_length=100, blank=True, default='')
+    # Higher is claimed first, see webui.agent.scheduler
+    priority = models.FloatField(default=0)
+    deadline = models.DateTimeField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    outcome = models.CharField(max_length=20, blank=True, default='')
+    attempts = models.IntegerField(default=0)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    lease_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'crawl_jobs'
+        indexes = [
+            models.Index(fields=['status', 'lease_until'], name='crawl_jobs_claim_idx'),
+            models.Index(fields=['status', '-priority'], name='crawl_jobs_priority_idx'),
+        ]
+
+
+class CacheGeneration(models.Model):
+    """
+    Generation counter of the cached article reads, shared by every web
+    worker and crawler host through the database. See webui.cache.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField()
+    modified_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'cache_generations'
@@ -0,0 +1,44 @@
+import json
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .cache import cached_read
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the PostgreSQL planner's row estimate instead of an
+    exact COUNT(*) once a query is estimated to return more than
+    `threshold` rows. Small results are still counted exactly.
+    """
+    threshold = 10000
+
+    def __init__(self, *args, request=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request = request
+
+    def estimate(self):
+        qs = self.object_list
+        connection = connections[qs.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = qs.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def compute_count(self):
+        estimate = self.estimate()
+        if estimate is not None and estimate > self.threshold:
+            return estimate
+        return self.object_list.count()
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        sql, params = self.object_list.query.sql_with_params()
+        return cached_read("count", f"{sql}|{params}", self.compute_count, request=self.request)
@@ -0,0 +1,59 @@
+import re
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+# news_articles.search_vector is a tsvector column kept up to date by a
+# trigger, see migrations 0004 and 0012: English stemming for the original text,
+# and CJK character bigrams for the Chinese columns, since Postgres has no
+# built-in Chinese parser.
+CJK_RUN = re.compile(r"[\u4e00-\u9fff]+")
+
+
+def cjk_bigrams(text: str) -> list[str]:
+    terms = []
+    for run in CJK_RUN.findall(text):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms += [run[i:i + 2] for i in range(len(run) - 1)]
+    return terms
+
+
+def build_tsquery(term: str) -> tuple[str, list]:
+    """
+    Returns the SQL and params of a tsquery matching term against
+    news_articles.search_vector.
+    """
+    parts = []
+    params = []
+    latin = CJK_RUN.sub(" ", term).strip()
+    if latin:
+        parts.append("plainto_tsquery('english', %s)")
+        params.append(latin)
+    lexemes = []
+    for gram in dict.fromkeys(cjk_bigrams(term)):
+        # A single character can only be matched as the start of a bigram
+        lexemes.append(f"'{gram}':*" if len(gram) == 1 else f"'{gram}'")
+    if lexemes:
+        parts.append("%s::tsquery")
+        params.append(" & ".join(lexemes))
+    return " && ".join(parts), params
+
+
+def is_available() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def search_articles(queryset, term: str):
+    """
+    Filters queryset to articles matching term through the GIN indexed
+    search_vector and annotates it with search_rank.
+    """
+    query, params = build_tsquery(term)
+    if not query:
+        return queryset
+    return (queryset
+            .filter(RawSQL(f"news_articles.search_vector @@ ({query})", params, output_field=BooleanField()))
+            .annotate(search_rank=RawSQL(f"ts_rank(news_articles.search_vector, {query})", params,
+                                         output_field=FloatField())))
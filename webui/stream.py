@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from webui.models import NewsArticles
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = getattr(settings, "NEWS_STREAM_CHANNEL", "fna_articles")
+KEEPALIVE_SECONDS = 15
+QUEUE_SIZE = 100
+REPLAY_LIMIT = 100
+# Backoff between attempts to reopen a dropped LISTEN connection
+RECONNECT_SECONDS = 1
+RECONNECT_MAX_SECONDS = 30
+SUMMARY_LENGTH = 300
+
+
+def article_payload(article, summary: str = "") -> str:
+    return json.dumps({
+        "id": article.id,
+        "title": article.title,
+        "cn_title": article.cn_title,
+        "source_name": article.source_name,
+        "publish_date": str(article.publish_date),
+        "summary": summary[:SUMMARY_LENGTH],
+    }, ensure_ascii=False)
+
+
+def notify_article(article, summary: str = ""):
+    """
+    Announces a newly saved article to every stream listener through
+    Postgres NOTIFY. Called by the pipeline after each save.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, article_payload(article, summary)])
+
+
+async def close_quietly(listener):
+    if listener is None:
+        return
+    try:
+        await listener.close()
+    except Exception as e:
+        logger.debug(f"Closing the stream listener failed: {e}")
+
+
+class ArticleBroadcaster:
+    """
+    Fans notifications out to connected clients. One LISTEN connection per
+    process, kept outside the pool, is shared by every client, and each
+    client only holds a small queue, so idle connections cost no database
+    resources. A dropped LISTEN connection is reopened with backoff while
+    clients are connected, and the articles saved in between are replayed.
+    """
+    def __init__(self, channel: str = CHANNEL):
+        self.channel = channel
+        self.subscribers: set[asyncio.Queue] = set()
+        self.listener = None
+        self.task = None
+        self.lock = None
+        # Newest article id published, where a replay after a reconnect starts
+        self.last_id = None
+        # A replayed article can also arrive as a notification
+        self.recent = deque(maxlen=QUEUE_SIZE)
+
+    async def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if connection.vendor == "postgresql":
+            if self.lock is None:
+                self.lock = asyncio.Lock()
+            async with self.lock:
+                if self.task is None:
+                    listener = await self.listen()
+                    self.task = asyncio.create_task(self.consume(listener))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self.stop()
+
+    def publish(self, payload: str):
+        article_id = json.loads(payload).get("id")
+        if article_id is not None:
+            if article_id in self.recent:
+                return
+            self.recent.append(article_id)
+        if isinstance(article_id, int) and (self.last_id is None or article_id > self.last_id):
+            self.last_id = article_id
+        for queue in self.subscribers:
+            if queue.full():
+                # A slow client loses its oldest event rather than blocking others
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def listen(self):
+        import psycopg
+        db = settings.DATABASES["default"]
+        listener = await psycopg.AsyncConnection.connect(
+            dbname=db["NAME"], user=db["USER"], password=db["PASSWORD"],
+            host=db["HOST"], port=db["PORT"], autocommit=True,
+        )
+        try:
+            await listener.execute(f'LISTEN "{self.channel}"')
+            if self.last_id is None:
+                self.last_id = await sync_to_async(latest_article_id)()
+            else:
+                # Reconnected: publish what was saved while nobody listened
+                for payload in await sync_to_async(missed_articles)(self.last_id):
+                    self.publish(payload)
+        except Exception:
+            await close_quietly(listener)
+            raise
+        self.listener = listener
+        logger.info(f"Listening on {self.channel}")
+        return listener
+
+    async def consume(self, listener):
+        delay = RECONNECT_SECONDS
+        try:
+            while self.subscribers:
+                try:
+                    if listener is None:
+                        listener = await self.listen()
+                        delay = RECONNECT_SECONDS
+                    async for notify in listener.notifies():
+                        self.publish(notify.payload)
+                    raise ConnectionError("notifications ended")
+                except Exception as e:
+                    logger.error(f"Stream listener failed, reconnecting in {delay}s: {e}")
+                    await close_quietly(listener)
+                    listener = None
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+        finally:
+            await close_quietly(listener)
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.listener = None
+        self.last_id = None
+        self.recent.clear()
+
+
+broadcaster = ArticleBroadcaster()
+
+
+def format_event(payload: str) -> str:
+    article_id = json.loads(payload).get("id", "")
+    return f"id: {article_id}\nevent: article\ndata: {payload}\n\n"
+
+
+def latest_article_id() -> int:
+    return NewsArticles.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def missed_articles(last_id: int) -> list[str]:
+    qs = (NewsArticles.objects.filter(id__gt=last_id).exclude(result='')
+          .defer('original_content', 'translated_content', 'result')
+          .select_related('analysis').order_by('id')[:REPLAY_LIMIT])
+    payloads = []
+    for article in qs:
+        analysis = getattr(article, 'analysis', None)
+        payloads.append(article_payload(article, analysis.summary if analysis else ""))
+    return payloads
+
+
+async def event_stream(last_id: int = None):
+    """
+    Server-sent events for newly saved articles. Articles after last_id
+    (the Last-Event-ID of a reconnecting client) are replayed first.
+    """
+    queue = await broadcaster.subscribe()
+    try:
+        yield f"retry: {KEEPALIVE_SECONDS * 1000}\n\n"
+        if last_id is not None:
+            for payload in await sync_to_async(missed_articles)(last_id):
+                yield format_event(payload)
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(payload)
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from webui.models import NewsArticles
+
+
+class NewsArticlesAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i, title in enumerate(['Fed signals rate cut', 'Oil prices climb', 'Fed holds rates']):
+            NewsArticles.objects.create(
+                title=title, cn_title=title, original_content=f'{title}. Markets react.',
+                source_url=f'https://example.com/news/{i}', source_name='yahoo', author='Reporter',
+                publish_date=timezone.now(), result='',
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('admin:webui_newsarticles_changelist')
+
+    def test_changelist(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_changelist_search(self):
+        response = self.client.get(self.url, {'q': 'fed'})
+        self.assertEqual(response.status_code, 200)
+        titles = {a.title for a in response.context['cl'].result_list}
+        self.assertEqual(titles, {'Fed signals rate cut', 'Fed holds rates'})
+
+    def test_changelist_search_with_column_sort(self):
+        response = self.client.get(self.url, {'q': 'fed', 'o': '1'})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,56 @@
+from django.test import SimpleTestCase
+import json
+from webui.agent.analysis import SECTORS, parse_analysis, parse_markdown, render_analysis
+
+LEGACY = """**新闻摘要：**
+美联储维持利率不变。
+
+**相关股票影响与建议：**
+* **影响：** 对银行股利好。
+* **建议：** 关注。
+
+**行业股票影响与建议：**
+* **金融股影响与建议：**
+    * **影响：** 利好银行。
+    * **建议：** 逢低关注。
+
+**风险提示：**
+政策变化。"""
+
+
+class ParseMarkdownTests(SimpleTestCase):
+    def test_related_block_is_not_a_company(self):
+        data = parse_markdown(LEGACY)
+        self.assertEqual(data['companies'], [])
+        self.assertIn('对银行股利好', data['related'])
+        self.assertEqual(data['summary'], '美联储维持利率不变。')
+        self.assertEqual(data['sectors']['finance']['impact'], 'positive')
+        self.assertEqual(set(data['sectors']), set(SECTORS))
+
+    def test_render_keeps_related_block(self):
+        self.assertIn('对银行股利好', render_analysis(parse_markdown(LEGACY)))
+
+
+def structured(**changes) -> str:
+    data = {
+        'summary': '美联储维持利率不变。',
+        'companies': [{'name': 'JPMorgan', 'impact': 'positive', 'reason': '息差', 'advice': '关注'}],
+        'sectors': {key: {'impact': 'neutral', 'reason': '', 'advice': ''} for key in SECTORS},
+        'risk': '政策变化。',
+    }
+    data.update(changes)
+    return json.dumps(data, ensure_ascii=False)
+
+
+class ParseAnalysisTests(SimpleTestCase):
+    def test_valid(self):
+        data = parse_analysis(structured())
+        self.assertEqual(data['companies'][0]['name'], 'JPMorgan')
+        self.assertEqual(set(data['sectors']), set(SECTORS))
+
+    def test_wrong_shapes_raise_value_error(self):
+        for changes in ({'companies': 5}, {'companies': {'name': 'x'}}, {'sectors': []}, {'summary': ''},
+                        {'sectors': {'tech': 'up'}}):
+            with self.subTest(changes=changes):
+                with self.assertRaises(ValueError):
+                    parse_analysis(structured(**changes))
@@ -0,0 +1,35 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from webui.agent import simhash
+from webui.archive import archive_articles
+from webui.models import NewsArticles, NewsFingerprint
+
+BODY = 'Inflation cooled more than expected in March, lifting bond prices across maturities.'
+
+
+class ArchivedArticleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.article = NewsArticles.objects.create(
+            title='Markets today', cn_title='今日市场', original_content=BODY, translated_content='通胀降温',
+            source_url='https://example.com/news/archived', source_name='yahoo', author='Reporter',
+            publish_date=timezone.now(), result='',
+        )
+        archive_articles([cls.article])
+
+    def test_admin_search_finds_archived_body(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:webui_newsarticles_changelist'), {'q': 'inflation'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a.id for a in response.context['cl'].result_list], [self.article.id])
+
+    def test_fingerprint_uses_archived_body(self):
+        self.assertEqual(NewsArticles.objects.get(id=self.article.id).original_content, '')
+        call_command('fingerprint', stdout=StringIO())
+        fingerprint = NewsFingerprint.objects.get(article_id=self.article.id)
+        self.assertEqual(fingerprint.simhash, simhash.to_signed(simhash.simhash(BODY)))
@@ -0,0 +1,19 @@
+from django.test import RequestFactory, TestCase
+from webui.cache import bump_generation, cached_read, generation
+
+
+class GenerationTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_read_once_per_request(self):
+        first = generation(self.request)
+        with self.assertNumQueries(0):
+            self.assertEqual(generation(self.request), first)
+            self.assertEqual(cached_read('test', 'key', lambda: 'value', request=self.request), 'value')
+
+    def test_bump_clears_request_generation(self):
+        first = generation(self.request)
+        bump_generation(self.request)
+        self.assertEqual(generation(self.request), first + 1)
+        self.assertEqual(generation(), first + 1)
@@ -0,0 +1,33 @@
+from django.test import TestCase, override_settings
+from webui.agent.rss_scraper import BaseRSSScraper
+from webui.agent.run import Pipeline
+from webui.models import SkippedArticle
+
+PROMO = {
+    'title': 'Sponsored: the best credit cards of the month',
+    'content': 'Sponsored. Shop now with this promo code and coupon for the best credit cards.',
+    'author': 'Partner', 'url': 'https://example.com/promo', 'published': '2025-01-01T08:00:00Z',
+}
+
+
+class StubScraper(BaseRSSScraper):
+    extracted = []
+
+    def get_feed_url(self):
+        return 'https://example.com/rss'
+
+    def extract_article(self, url):
+        self.extracted.append(url)
+        return dict(PROMO, url=url)
+
+
+@override_settings(RSS_SCRAPER='stub', RSS_SCRAPER_REGISTRY={'stub': f'{__name__}.StubScraper'},
+                   TRANSLATOR='ollama', ANALYZER='ollama', PREFILTER_ACTION='skip')
+class PrefilterSkipTests(TestCase):
+    def test_skipped_item_is_not_extracted_again(self):
+        StubScraper.extracted = []
+        item = {'link': PROMO['url'], 'title': PROMO['title'], 'published': PROMO['published']}
+        self.assertEqual(Pipeline(workers=1).process_article(dict(item)), 'skipped')
+        self.assertEqual(SkippedArticle.objects.get(url=PROMO['url']).reason, 'promotional')
+        self.assertEqual(Pipeline(workers=1).process_article(dict(item)), 'duplicate')
+        self.assertEqual(StubScraper.extracted, [PROMO['url']])
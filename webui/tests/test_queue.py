@@ -0,0 +1,19 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from webui.agent import queue
+from webui.models import CrawlJob
+
+
+class PruneTests(TestCase):
+    def test_prunes_old_finished_jobs_only(self):
+        old = timezone.now() - timedelta(days=queue.RETENTION_DAYS + 1)
+        for i, status in enumerate([CrawlJob.DONE, CrawlJob.FAILED, CrawlJob.PENDING, CrawlJob.RUNNING]):
+            CrawlJob.objects.create(url=f'https://example.com/old/{i}', status=status)
+        CrawlJob.objects.create(url='https://example.com/recent', status=CrawlJob.DONE)
+        # updated_at is auto_now, so age the rows with an update
+        CrawlJob.objects.filter(url__startswith='https://example.com/old/').update(updated_at=old)
+        self.assertEqual(queue.prune(), 2)
+        self.assertEqual(set(CrawlJob.objects.values_list('status', flat=True)),
+                         {CrawlJob.PENDING, CrawlJob.RUNNING, CrawlJob.DONE})
+        self.assertTrue(CrawlJob.objects.filter(url='https://example.com/recent').exists())
@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase, override_settings
+from webui.agent.scheduler import FreshnessScheduler
+
+
+class FreshnessSchedulerTests(SimpleTestCase):
+    def test_undated_items_run_last(self):
+        items = [
+            {'link': 'undated', 'published': ''},
+            {'link': 'old', 'published': 'Mon, 01 Jan 2024 08:00:00 GMT'},
+            {'link': 'new', 'published': '2024-01-02T08:00:00Z'},
+        ]
+        ordered = FreshnessScheduler('yahoo').order(items)
+        self.assertEqual([i['link'] for i in ordered], ['new', 'old', 'undated'])
+        self.assertIsNotNone(ordered[-1]['deadline'])
+
+    def test_stale_items_are_processed_by_default(self):
+        scheduler = FreshnessScheduler('yahoo')
+        self.assertEqual(scheduler.stale_action, 'process')
+        self.assertFalse(scheduler.is_stale({'published': 'Mon, 01 Jan 2024 08:00:00 GMT'}))
+
+    @override_settings(CRAWL_STALE_ACTION='light')
+    def test_stale_action(self):
+        scheduler = FreshnessScheduler('yahoo')
+        self.assertTrue(scheduler.is_stale({'published': 'Mon, 01 Jan 2024 08:00:00 GMT'}))
+        self.assertFalse(scheduler.is_stale({'published': ''}))
@@ -0,0 +1,25 @@
+import importlib.util
+import os
+import runpy
+import unittest
+from unittest import mock
+from django.conf import settings
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+POSTGRES_ENV = {'DB_ENGINE': 'postgresql', 'DB_NAME': 'fna', 'DB_USER': 'fna', 'DB_PASSWORD': 'fna'}
+
+
+@unittest.skipUnless(importlib.util.find_spec('psycopg_pool'), 'psycopg_pool is not installed')
+class PostgresSettingsTests(SimpleTestCase):
+    def test_pool_can_be_built(self):
+        # The shipped Postgres settings, whatever engine the tests run on
+        with mock.patch.dict(os.environ, POSTGRES_ENV):
+            databases = runpy.run_path(str(settings.BASE_DIR / 'fna' / 'settings.py'))['DATABASES']
+        connection = ConnectionHandler(databases)['default']
+        try:
+            pool = connection.pool
+            self.assertIsNotNone(pool)
+            self.assertEqual(pool.max_size, databases['default']['OPTIONS']['pool']['max_size'])
+        finally:
+            connection.close_pool()
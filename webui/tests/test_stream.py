@@ -0,0 +1,51 @@
+import asyncio
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from webui.models import NewsArticles
+from webui.stream import broadcaster
+
+
+class ArticleStreamTests(TestCase):
+    async def open_stream(self):
+        response = await self.async_client.get(reverse('webui:article_stream'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        return stream
+
+    async def next_event(self, stream) -> bytes:
+        return await asyncio.wait_for(anext(stream), 10)
+
+    async def test_published_article_is_streamed(self):
+        stream = await self.open_stream()
+        broadcaster.publish(json.dumps({'id': 7, 'cn_title': '美联储维持利率不变'}, ensure_ascii=False))
+        event = (await self.next_event(stream)).decode()
+        self.assertIn('id: 7\nevent: article\n', event)
+        self.assertIn('美联储维持利率不变', event)
+
+    async def test_reconnects_after_dropped_listener(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('LISTEN/NOTIFY needs PostgreSQL')
+        with mock.patch('webui.stream.RECONNECT_SECONDS', 0.1):
+            stream = await self.open_stream()
+            pid = broadcaster.listener.info.backend_pid
+            # Saved while the listener is down, so it has to come from the replay
+            article = await sync_to_async(NewsArticles.objects.create)(
+                title='Fed holds rates', cn_title='美联储维持利率', original_content='', source_url='https://example.com/fed',
+                source_name='yahoo', author='Reporter', publish_date=timezone.now(), result='分析',
+            )
+            await sync_to_async(self.terminate)(pid)
+            event = (await self.next_event(stream)).decode()
+        self.assertIn(f'id: {article.id}\n', event)
+        self.assertIsNot(broadcaster.listener, None)
+
+    @staticmethod
+    def terminate(pid: int):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from webui.models import NewsArticles
+
+
+class ArticlesApiTests(TestCase):
+    def setUp(self):
+        self.url = reverse('webui:articles')
+
+    def test_list(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_invalid_date(self):
+        for params in ({'since': '2025-13-45'}, {'until': '2025-01-01T25:00:00'}, {'since': 'yesterday'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Invalid date', response.json()['error'])
+
+    def test_unknown_sector(self):
+        response = self.client.get(self.url, {'sector': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_impact(self):
+        response = self.client.get(self.url, {'sector': 'tech', 'impact': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown impact', response.json()['error'])
+
+    def test_valid_impact(self):
+        response = self.client.get(self.url, {'sector': 'tech', 'impact': 'positive'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ArticlesPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now().replace(microsecond=0)
+        # Three articles share a publish_date, so paging has to break ties on id
+        dates = [now, now - timedelta(hours=1), now - timedelta(hours=1), now - timedelta(hours=1), now - timedelta(hours=2)]
+        cls.articles = [
+            NewsArticles.objects.create(
+                title=f'Article {i}', cn_title=f'Article {i}', original_content='Markets react.',
+                source_url=f'https://example.com/news/{i}', source_name='yahoo', author='Reporter',
+                publish_date=published, result='Analysis',
+            )
+            for i, published in enumerate(dates)
+        ]
+        # Unanalyzed articles are not listed
+        NewsArticles.objects.create(title='Pending', source_url='https://example.com/news/pending',
+                                    source_name='yahoo', publish_date=now, result='')
+
+    def setUp(self):
+        self.url = reverse('webui:articles')
+        cache.clear()
+
+    def expected_ids(self):
+        ordered = sorted(self.articles, key=lambda a: (a.publish_date, a.id), reverse=True)
+        return [a.id for a in ordered]
+
+    def test_keyset_order(self):
+        results = self.client.get(self.url).json()['results']
+        self.assertEqual([r['id'] for r in results], self.expected_ids())
+
+    def test_next_cursor_pages_across_ties(self):
+        ids, params = [], {'limit': 2}
+        while True:
+            data = self.client.get(self.url, params).json()
+            self.assertLessEqual(len(data['results']), 2)
+            ids += [r['id'] for r in data['results']]
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(ids, self.expected_ids())
+
+    def test_last_page_has_no_cursor(self):
+        data = self.client.get(self.url, {'limit': len(self.articles)}).json()
+        self.assertEqual(len(data['results']), len(self.articles))
+        self.assertIsNone(data['next_cursor'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, {'limit': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Another query has another ETag
+        response = self.client.get(self.url, {'limit': 3}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_page_reads_generation_once(self):
+        self.client.get(self.url, {'limit': 2})
+        # The ETag, Last-Modified and the cached page share one generation read
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+
+    def test_fields(self):
+        results = self.client.get(self.url, {'fields': 'id,title,result'}).json()['results']
+        self.assertEqual(set(results[0]), {'id', 'title', 'result'})
+        self.assertEqual(results[0]['result'], 'Analysis')
+
+    def test_default_fields(self):
+        results = self.client.get(self.url).json()['results']
+        self.assertEqual(set(results[0]), {'id', 'title', 'cn_title', 'source_name', 'source_url', 'author',
+                                           'publish_date', 'created_at'})
+
+    def test_unknown_field(self):
+        response = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.url = reverse('webui:metrics')
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name: str, process: str):
+        with open(os.path.join(self.dir.name, name), 'w') as f:
+            f.write('# HELP fna_articles_total Processed feed items by outcome.\n'
+                    '# TYPE fna_articles_total counter\n'
+                    f'fna_articles_total{{process="{process}",outcome="saved"}} 3\n')
+
+    def test_no_metrics(self):
+        with override_settings(METRICS_DIR=self.dir.name):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_merges_processes(self):
+        self.write('a-1.prom', 'a-1')
+        self.write('b-2.prom', 'b-2')
+        with override_settings(METRICS_DIR=self.dir.name):
+            body = self.client.get(self.url).content.decode()
+        self.assertEqual(body.count('# TYPE fna_articles_total counter'), 1)
+        self.assertIn('process="a-1"', body)
+        self.assertIn('process="b-2"', body)
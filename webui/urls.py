@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'webui'
+
+urlpatterns = [
+    path('articles/', views.articles, name='articles'),
+    path('articles/stream/', views.article_stream, name='article_stream'),
+    path('metrics/', views.metrics, name='metrics'),
+]
@@ -1,3 +1,185 @@
-from django.shortcuts import render
+import base64
+import hashlib
+from datetime import datetime, time
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import condition, require_GET
+from .agent import metrics as crawler_metrics
+from .agent.analysis import SECTORS
+from .archive import restore_content
+from .cache import cached_read, generation, last_modified
+from .models import NewsArticles, NewsImpact
+from .stream import event_stream
 
-# Create your views here.
+DEFAULT_FIELDS = ['id', 'title', 'cn_title', 'source_name', 'source_url', 'author', 'publish_date', 'created_at']
+BODY_FIELDS = ['original_content', 'translated_content', 'result']
+# 'analysis' is the structured analysis, the others are NewsArticles columns
+ALLOWED_FIELDS = DEFAULT_FIELDS + ['crawl_date', 'translator', 'analyzer'] + BODY_FIELDS + ['analysis']
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class BadRequest(Exception):
+    pass
+
+
+def encode_cursor(article) -> str:
+    raw = f"{article.publish_date.isoformat()}|{article.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published, article_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(published), int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise BadRequest("Invalid cursor")
+
+
+def parse_bound(value: str, end_of_day: bool = False) -> datetime:
+    """Accepts an ISO datetime or a date, a date covers the whole day."""
+    try:
+        # Well formed but impossible values such as 2025-13-45 raise ValueError
+        dt = parse_datetime(value)
+        if dt is None:
+            d = parse_date(value)
+            if d is None:
+                raise BadRequest(f"Invalid date: {value}")
+            dt = datetime.combine(d, time.max if end_of_day else time.min)
+    except ValueError:
+        raise BadRequest(f"Invalid date: {value}")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def parse_fields(value: str) -> list[str]:
+    if not value:
+        return DEFAULT_FIELDS
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in ALLOWED_FIELDS]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def filter_articles(params) -> tuple:
+    """
+    Returns the filtered queryset, newest first, and the selected fields.
+    """
+    qs = NewsArticles.objects.exclude(result='')
+    if params.get('source'):
+        qs = qs.filter(source_name=params['source'])
+    if params.get('since'):
+        qs = qs.filter(publish_date__gte=parse_bound(params['since']))
+    if params.get('until'):
+        qs = qs.filter(publish_date__lte=parse_bound(params['until'], end_of_day=True))
+    if params.get('sector'):
+        if params['sector'] not in SECTORS:
+            raise BadRequest(f"Unknown sector: {params['sector']}")
+        impact = {'analysis__impacts__scope': NewsImpact.SECTOR, 'analysis__impacts__name': params['sector']}
+        if params.get('impact'):
+            if params['impact'] not in dict(NewsImpact.IMPACT_CHOICES):
+                raise BadRequest(f"Unknown impact: {params['impact']}")
+            impact['analysis__impacts__impact'] = params['impact']
+        qs = qs.filter(**impact)
+    if params.get('cursor'):
+        published, article_id = decode_cursor(params['cursor'])
+        qs = qs.filter(Q(publish_date__lt=published) | Q(publish_date=published, id__lt=article_id))
+    fields = parse_fields(params.get('fields', ''))
+    columns = {'id', 'publish_date'} | {f for f in fields if f != 'analysis'}
+    qs = qs.only(*columns).order_by('-publish_date', '-id')
+    if 'analysis' in fields:
+        qs = qs.prefetch_related('analysis__impacts')
+    if any(f in BODY_FIELDS for f in fields):
+        qs = qs.prefetch_related('archived_content')
+    return qs, fields
+
+
+def serialize(article, fields: list[str]) -> dict:
+    if any(f in BODY_FIELDS for f in fields):
+        restore_content(article)
+    data = {}
+    for field in fields:
+        if field == 'analysis':
+            analysis = getattr(article, 'analysis', None)
+            data[field] = analysis.to_dict() if analysis else None
+        else:
+            value = getattr(article, field)
+            data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def articles_etag(request, *args, **kwargs):
+    key = f"{generation(request)}|{request.GET.urlencode()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def articles_last_modified(request, *args, **kwargs):
+    return last_modified(request)
+
+
+@require_GET
+@condition(etag_func=articles_etag, last_modified_func=articles_last_modified)
+def articles(request):
+    """
+    Latest analyzed articles, newest first, with keyset pagination on
+    (publish_date, id). Query parameters: source, since, until, sector,
+    impact, fields, limit and cursor (next_cursor of the previous page).
+    """
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+
+    def compute():
+        qs, fields = filter_articles(request.GET)
+        page = list(qs[:limit + 1])
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return {'results': [serialize(a, fields) for a in page[:limit]], 'next_cursor': next_cursor}
+
+    try:
+        data = cached_read('api', f"{limit}|{request.GET.urlencode()}", compute, request=request)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    response = JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+    patch_cache_control(response, max_age=30)
+    return response
+
+
+@require_GET
+async def article_stream(request):
+    """
+    Server-sent event stream of newly saved articles. Needs an ASGI server;
+    a reconnecting client resumes after its Last-Event-ID.
+    """
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid last event id'}, status=400)
+    response = StreamingHttpResponse(event_stream(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def metrics(request):
+    """
+    The crawler metrics in the Prometheus text format, merged from the files
+    the crawler processes write to METRICS_DIR.
+    """
+    body = crawler_metrics.collect()
+    if not body:
+        raise Http404('No crawler metrics, run the crawler with METRICS_ENABLED or --metrics')
+    response = HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    return response